@@ -1,6 +1,6 @@
 """Services to generate LLM responses and handle them using Pydantic AI."""
 
-from typing import AsyncGenerator, List
+from typing import AsyncGenerator, List, Optional
 from pydantic_ai import Agent
 from pydantic_ai.messages import (
     PartDeltaEvent,
@@ -30,7 +30,9 @@ class AgentService:
         self.prompt_version = prompt_version
         self.agent = agent_factory.create_agent_from_prompt_version(self.prompt_version)
 
-    async def stream_agent_response(self, user_question: str, conversation_id: uuid) -> AsyncGenerator[str, None]:
+    async def stream_agent_response(
+        self, user_question: str, conversation_id: uuid, skye_version: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
         """Streams the agent's response to a user question in real-time.
 
         This method serves as the public interface for streaming responses
@@ -39,6 +41,7 @@ class AgentService:
         Args:
             user_question (str): The user’s question or input prompt.
             conversation_id (uuid): The unique identifier of the conversation.
+            skye_version (Optional[str]): Skye major version the user works with. Tools are asked to scope to it.
 
         Yields:
             str: A stream of text chunks representing the agent's incremental response.
@@ -47,7 +50,7 @@ class AgentService:
             UsageLimitExceededError: When a usage limit is exceeded.
             ResponseGenerationError: For various errors during response generation.
         """
-        user_prompt = self._construct_user_prompt(user_question)
+        user_prompt = self._construct_user_prompt(user_question, skye_version)
         existing_conversation = await self.store_manager.get_conversation_by_id(conversation_id)
         return self._stream_agent_response_pydantic(user_prompt, conversation_id, existing_conversation.contents)
 
@@ -71,13 +74,18 @@ class AgentService:
             await self._add_conversation_to_store(run, conversation_id)
             logger.info(f"Answer generation for conversation_id {conversation_id} finished.")
 
-    def _construct_user_prompt(self, user_question: str):
+    def _construct_user_prompt(self, user_question: str, skye_version: Optional[str] = None):
         """Constructs the final user prompt.
 
-        Injects the user's question into a predefined template.
+        Injects the user's question into a predefined template. If the Skye version is known and the prompt
+        definition has a version template, it is appended so the agent scopes its searches to that version.
         """
         prompt_template = self.prompt_version.prompt_template
-        return utils.replace_placeholders(prompt_template, {"user_question": user_question})
+        user_prompt = utils.replace_placeholders(prompt_template, {"user_question": user_question})
+        skye_version_template = self.prompt_version.skye_version_template
+        if skye_version and skye_version_template:
+            user_prompt += utils.replace_placeholders(skye_version_template, {"skye_version": skye_version})
+        return user_prompt
 
     @staticmethod
     async def _handle_model_request_node(node: ModelRequestNode, run: AgentRun):
@@ -24,6 +24,7 @@ class PromptDefinition(BaseModel):
         instructions: Agent instructions (system-level).
         system_prompt: System-level prompt to prepend.
         prompt_template: Optional template to format user question.
+        skye_version_template: Optional template appended to the user prompt when the Skye version is known.
         tools: External tools the agent may invoke.
     """
 
@@ -37,6 +38,7 @@ class PromptDefinition(BaseModel):
     instructions: Optional[str] = Field(default=None)
     system_prompt: Optional[str] = Field(default=None)
     prompt_template: Optional[str] = Field(default=None)
+    skye_version_template: Optional[str] = Field(default=None)
     tools: List[Callable] = Field(default=None)
 
 
@@ -116,7 +118,10 @@ followup for more details.
 You are an agent whose job is to answer questions based the documentation of the Innoveo Skye or related documents.
 Use your tools to check the documentation. User's question: {{user_question}}
 """,
-    tools=[tools.search_in_skye_documentation],
+    skye_version_template="""
+The user works with Skye version {{skye_version}}. Pass it as skye_version to your tools.
+""",
+    tools=[tools.search_in_skye_documentation, tools.search_in_all_documentation],
 )
 
 loading_text_generator_v1 = PromptDefinition(
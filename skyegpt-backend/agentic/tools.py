@@ -1,14 +1,21 @@
 """Collects the possible tools the LLM agents can use."""
 
 from database import vectordb_client
-from typing import List, Dict
+from typing import List, Dict, Optional
+from common import logger, message_bundle
+from common.constants import DocumentationSourceType
+from common.exceptions import VectorDBUnavailableError
 
 
-def search_in_skye_documentation(query: str) -> List[Dict]:
+def search_in_skye_documentation(
+    query: str, skye_version: Optional[str] = None, source: Optional[DocumentationSourceType] = "skye"
+) -> List[Dict]:
     r"""Search in Skye documentation. It is a semantic vector database.
 
     Args:
         query: the question to find the relevant information of
+        skye_version: Skye major version in format X.Y (e.g. 10.0). Leave empty to search the latest version.
+        source: "skye" for the Skye product documentation (default), "iph" for the Innoveo Partner Hub.
 
     Returns:
         List[Dict]: a list of dict which contains the relevant document and the metadata with the
@@ -19,4 +26,33 @@ def search_in_skye_documentation(query: str) -> List[Dict]:
                 "documentation_link": "https://sample-url.net/wiki/spaces/IPH/pages/1814692263"
               }
     """
-    return vectordb_client.find_related_documents_to_query(query)
+    try:
+        return vectordb_client.find_related_documents_to_query(query, skye_version, source)
+    except VectorDBUnavailableError as e:
+        return _documentation_search_unavailable(e)
+
+
+def search_in_all_documentation(query: str, skye_version: Optional[str] = None) -> List[Dict]:
+    r"""Search in the Skye documentation and the Innoveo Partner Hub at once. It is a semantic vector database.
+
+    Use it when the answer could be in either source, instead of searching them one after the other.
+
+    Args:
+        query: the question to find the relevant information of
+        skye_version: Skye major version in format X.Y (e.g. 10.0). Leave empty to search the latest version.
+
+    Returns:
+        List[Dict]: a list of dict which contains the relevant document and the metadata with the
+        filename, documentation_link and source, ranked across both sources.
+    """
+    try:
+        collection_names = vectordb_client.resolve_collection_names(skye_version)
+        return vectordb_client.find_related_documents_in_collections(query, collection_names)
+    except VectorDBUnavailableError as e:
+        return _documentation_search_unavailable(e)
+
+
+def _documentation_search_unavailable(error: VectorDBUnavailableError) -> Dict:
+    """Degraded-mode result telling the agent to answer without the documentation instead of retrying."""
+    logger.warning(f"Documentation search unavailable: {error.message}")
+    return {"documents": [], "error": message_bundle.DOCUMENTATION_SEARCH_UNAVAILABLE}
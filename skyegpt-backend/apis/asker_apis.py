@@ -61,7 +61,7 @@ async def stream_agent_response(
     conversation_id = request.conversation_id
     question = request.query
     logger.info(f"Received request for /stream: conversation_id='{conversation_id}'")
-    response_stream = streaming_service.stream_agent_response(question, conversation_id)
+    response_stream = streaming_service.stream_agent_response(question, conversation_id, request.skye_version)
     return StreamingResponse(response_stream, media_type="text/event-stream")
 
 
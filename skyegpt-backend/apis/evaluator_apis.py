@@ -35,7 +35,9 @@ async def generate_agent_response_with_context(
     logger.info(f"Received request aggregated agent response: conversation_id='{conversation_id}'")
 
     with_context = True
-    response_dict = await agent_response_service.aggregated_agent_response(query, conversation_id, with_context)
+    response_dict = await agent_response_service.aggregated_agent_response(
+        query, conversation_id, with_context, request.skye_version
+    )
     generated_answer = response_dict.get("generated_answer")
     context = response_dict.get("curr_context")
     return AgentResponse(generated_answer=generated_answer, curr_context=context)
@@ -32,6 +32,15 @@ class ConversationQueryRequest(BaseModel):
         examples=["Does Skye support SOAP API?"],
         max_length=4000,
     )
+    skye_version: Optional[str] = Field(
+        default=None,
+        pattern=r"^\d+\.\d+$",
+        description="Skye major version the user works with. Documentation search is scoped to it if given.",
+        examples=["10.0", "9.16"],
+        json_schema_extra={
+            "error_messages": {"pattern": "Invalid version format. Must be in format 'X.Y' (e.g., '9.16', '10.3')"}
+        },
+    )
 
 
 class ImportRequest(BaseModel):
@@ -62,6 +71,31 @@ class ImportRequest(BaseModel):
 
         enabled: bool
 
+    class IndexConfig(BaseModel):
+        """HNSW index parameters of the created collections. Omitted parameters use the database defaults."""
+
+        space: Optional[constants.DistanceSpaceType] = Field(
+            default=None, description="Distance function of the index.", examples=["cosine"]
+        )
+        max_neighbors: Optional[int] = Field(
+            default=None,
+            ge=2,
+            description="Maximum number of neighbours per node in the graph (M). Higher improves recall, uses memory.",
+            examples=[16],
+        )
+        ef_construction: Optional[int] = Field(
+            default=None,
+            ge=1,
+            description="Size of the candidate list while building the index. Higher improves index quality.",
+            examples=[100],
+        )
+        ef_search: Optional[int] = Field(
+            default=None,
+            ge=1,
+            description="Size of the candidate list while searching. Higher improves recall, slows down queries.",
+            examples=[100],
+        )
+
     class ImportsConfig(BaseModel):
         """Container for different import source configurations."""
 
@@ -70,6 +104,13 @@ class ImportRequest(BaseModel):
 
     markdown_split_headers: List[Literal["#", "##", "###"]]
     imports: ImportsConfig
+    parent_document_retrieval: bool = Field(
+        default=True,
+        description="Embed small chunks of every header section for search and return the whole section as context.",
+    )
+    index: Optional[IndexConfig] = Field(
+        default=None, description="HNSW index parameters. Only ef_search is applied if the collection already exists."
+    )
 
     @classmethod
     @field_validator("split_headers")
@@ -69,7 +69,9 @@ class DownloadResponse(BaseModel):
 class ImportResponse(BaseModel):
     """Response model for import services."""
 
-    number_of_documents: int = Field(..., description="Number of documents after the import.")
+    number_of_documents: int = Field(
+        ..., description="Number of documents in the imported collections after the import."
+    )
 
     model_config = {"json_schema_extra": {"examples": [{"number_of_documents": 42}]}}
 
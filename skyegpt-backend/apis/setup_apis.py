@@ -9,7 +9,7 @@ from common.exceptions import CollectionNotFoundError
 from .schemas.requests import SkyeVersionRequest, ImportRequest
 from .schemas.responses import DownloadResponse, ImportResponse
 from common.decorators import handle_unknown_errors
-from common import message_bundle, constants
+from common import message_bundle, constants, utils
 
 
 setup_apis_router = APIRouter(prefix="/setup", tags=["Setup Endpoints"])
@@ -92,7 +92,7 @@ async def delete_collection(collection_name: str, db_service: DatabaseService =
                                 retriever will fetch it from to give context to the AI agents"""
     ),
     responses={
-        200: {"description": "Import successful. Returns the number of all imported documents."},
+        200: {"description": "Import successful. Returns the number of documents in the imported collections."},
         500: {"description": message_bundle.INTERNAL_ERROR},
         422: {"description": "Incorrect request"},
     },
@@ -105,17 +105,24 @@ async def import_to_database(
 ) -> ImportResponse:
     """Imports downloaded documentation content into the vector database."""
     markdown_split_headers = request.markdown_split_headers
+    parent_document_retrieval = request.parent_document_retrieval
+    index_configuration = request.index.model_dump(exclude_none=True) if request.index else None
+    imported_collection_names = []
 
     should_import_skyedoc: bool = request.imports.skyedoc.enabled
     if should_import_skyedoc:
         logger.info("Starting to import skyedoc")
         skye_major_version = request.imports.skyedoc.skye_major_version
-        ingestion_service.import_skyedoc(skye_major_version, markdown_split_headers)
+        ingestion_service.import_skyedoc(
+            skye_major_version, markdown_split_headers, parent_document_retrieval, index_configuration
+        )
+        imported_collection_names.append(utils.generate_skye_doc_collection_name(skye_major_version))
 
     should_import_iph: bool = request.imports.innoveo_partner_hub.enabled
     if should_import_iph:
         logger.info("Starting to import IPH")
-        ingestion_service.import_iph(markdown_split_headers)
+        ingestion_service.import_iph(markdown_split_headers, parent_document_retrieval, index_configuration)
+        imported_collection_names.append(constants.IPH_DOC_COLLECTION_NAME)
 
     if not should_import_skyedoc and not should_import_iph:
         logger.warning(message_bundle.NO_IMPORT_SELECTED)
@@ -123,5 +130,8 @@ async def import_to_database(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=message_bundle.NO_IMPORT_SELECTED
         ) from None
 
-    number_of_documents = database_service.number_of_documents_in_collection(constants.SKYE_DOC_COLLECTION_NAME)
+    number_of_documents = sum(
+        database_service.number_of_documents_in_collection(collection_name)
+        for collection_name in imported_collection_names
+    )
     return ImportResponse(number_of_documents=number_of_documents)
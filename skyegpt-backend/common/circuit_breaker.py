@@ -0,0 +1,81 @@
+"""Circuit breaker that stops calling a failing dependency until it recovers.
+
+The breaker is closed while calls succeed. After failure_threshold consecutive failures it opens and
+rejects calls immediately instead of letting every caller wait for a timeout. Once reset_seconds have
+passed it lets a single trial call through (half-open): a success closes it again, a failure reopens it.
+"""
+
+import threading
+import time
+from enum import Enum
+from common import logger, metrics
+
+
+class CircuitState(int, Enum):
+    """Enumerates the states of a circuit breaker. The values are reported in the state gauge."""
+
+    closed = 0
+    half_open = 1
+    open = 2
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker counting consecutive failures of a dependency."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        """Initialize a closed breaker.
+
+        Args:
+            name: name of the protected dependency, used in logs and metric names
+            failure_threshold: number of consecutive failures that opens the breaker
+            reset_seconds: time the breaker stays open before a trial call is allowed
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = CircuitState.closed
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        self._report_state()
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current state of the breaker."""
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return whether a call may be made now. Moves an open breaker to half-open after reset_seconds."""
+        with self._lock:
+            if self._state == CircuitState.closed:
+                return True
+            if self._state == CircuitState.open and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._set_state(CircuitState.half_open)
+                return True
+        metrics.increment(f"{self.name}.circuit_breaker.rejected_calls")
+        return False
+
+    def record_success(self) -> None:
+        """Register a successful call, closing the breaker."""
+        with self._lock:
+            self._consecutive_failures = 0
+            if self._state != CircuitState.closed:
+                self._set_state(CircuitState.closed)
+
+    def record_failure(self) -> None:
+        """Register a failed call, opening the breaker at the threshold or after a failed trial call."""
+        with self._lock:
+            self._consecutive_failures += 1
+            metrics.increment(f"{self.name}.circuit_breaker.failures")
+            if self._state == CircuitState.half_open or self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self._state != CircuitState.open:
+                    self._set_state(CircuitState.open)
+
+    def _set_state(self, state: CircuitState) -> None:
+        logger.warning(f"Circuit breaker of {self.name} changed from {self._state.name} to {state.name}")
+        self._state = state
+        self._report_state()
+
+    def _report_state(self) -> None:
+        metrics.set_gauge(f"{self.name}.circuit_breaker.state", self._state.value)
@@ -9,15 +9,39 @@ MEDIA_TYPE_SSE = "text/event-stream"
 
 # DATA_INGESTION
 IPH_LOCAL_FOLDER_LOCATION = "content/innoveo-partner-hub"
-SKYE_DOC_COLLECTION_NAME = "SkyeDoc"
-IPH_DOC_COLLECTION_NAME = "SkyeDoc"
+SKYE_DOC_COLLECTION_NAME_PREFIX = "SkyeDoc-"
+SKYE_DOC_COLLECTION_NAME_TEMPLATE = SKYE_DOC_COLLECTION_NAME_PREFIX + "{{skye_major_version}}"
+IPH_DOC_COLLECTION_NAME = "InnoveoPartnerHub"
 SKYE_DOC_LOCAL_FOLDER_LOCATION_TEMPLATE = "content/skyedoc/skye-{{skye_major_version}}"
+PARENT_COLLECTION_NAME_SUFFIX = "-parents"
+CHILD_CHUNK_SIZE = 400
+CHILD_CHUNK_OVERLAP = 50
+IMPORT_MANIFEST_FOLDER_LOCATION = "content/import-manifests"
+IMPORT_WRITER_PROCESSES = 4
+IMPORT_QUEUE_BATCHES_PER_WRITER = 2
+IMPORT_PARSER_FILES_PER_TASK = 16
 
 # ASKER
 MAX_CONVERSATION_LENGTH = 20
 
 # RETRIEVER
 VECTOR_NUMBER_OF_RESULTS = 10
+VECTOR_MMR_ENABLED = True
+VECTOR_MMR_LAMBDA = 0.7
+VECTOR_MMR_FETCH_K_MULTIPLIER = 4
+VECTOR_FAN_OUT_RESULTS_PER_COLLECTION = 6
+VECTOR_FAN_OUT_MAX_WORKERS = 8
+VECTOR_MAX_PARENT_SECTIONS = 5
+
+# Vector DB connection
+VECTOR_DB_CONNECT_TIMEOUT_SECONDS = 2.0
+VECTOR_DB_READ_TIMEOUT_SECONDS = 30.0
+VECTOR_DB_MAX_CONNECTIONS = 20
+VECTOR_DB_MAX_KEEPALIVE_CONNECTIONS = 10
+VECTOR_DB_KEEPALIVE_EXPIRY_SECONDS = 30.0
+VECTOR_DB_HEALTH_PROBE_INTERVAL_SECONDS = 10.0
+VECTOR_DB_CIRCUIT_FAILURE_THRESHOLD = 3
+VECTOR_DB_CIRCUIT_RESET_SECONDS = 30.0
 
 # Document DB
 DOCUMENT_DB_NAME = "skyegpt"
@@ -25,6 +49,8 @@ CONVERSATIONS_COLLECTION_NAME = "conversations"
 
 # Type Alias
 VoteType: TypeAlias = Literal["positive", "negative", "not_specified"]
+DocumentationSourceType: TypeAlias = Literal["skye", "iph"]
+DistanceSpaceType: TypeAlias = Literal["l2", "cosine", "ip"]
 
 
 class PromptUseCase(str, Enum):
@@ -38,5 +38,9 @@ class VectorDBError(SkyeGptException):
     """Custom exception raised for Vector DB related operations."""
 
 
+class VectorDBUnavailableError(VectorDBError):
+    """Custom exception raised when the Vector DB cannot be reached or its circuit breaker is open."""
+
+
 class ObjectNotFoundError(SkyeGptException):
     """Custom exception when an object is not found in a database and returning None is not an option."""
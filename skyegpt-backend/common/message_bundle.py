@@ -6,5 +6,9 @@ NO_IMPORT_SELECTED = "Error: No import option selected"
 CONVERSATION_NOT_FOUND = "Error: Conversation not found"
 VERSION_DOES_NOT_EXISTS = "Error: Requested version does not exist in S3 bucket"
 COLLECTION_NOT_FOUND = "Error: Requested collection was not found"
+DOCUMENTATION_SEARCH_UNAVAILABLE = (
+    "The documentation search is temporarily unavailable. Do not retry the search. Answer from your own knowledge "
+    "if you can, and tell the user that the documentation could not be checked, so the answer may be incomplete."
+)
 CONTENT_ARCHIVED_MESSAGE = "content archived for space saving purposes"
 VALUE_NOT_FOUND = "VALUE_NOT_FOUND"
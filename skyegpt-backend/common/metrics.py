@@ -0,0 +1,39 @@
+"""Provides a centralized interface for application metrics.
+
+Like the logger, it wraps logfire so the metrics backend can be replaced in one place.
+Instruments are created once per name and reused.
+
+Usage:
+    metrics.increment("vectordb.circuit_breaker.rejected_calls")
+    metrics.set_gauge("vectordb.circuit_breaker.state", 2)
+"""
+
+import threading
+import logfire
+
+_counters: dict = {}
+_gauges: dict = {}
+_histograms: dict = {}
+_lock = threading.Lock()
+
+
+def increment(name: str, amount: int = 1, **attributes):
+    """Adds amount to the counter with the given name."""
+    _get_instrument(_counters, name, logfire.metric_counter).add(amount, attributes)
+
+
+def set_gauge(name: str, value: float, **attributes):
+    """Sets the current value of the gauge with the given name."""
+    _get_instrument(_gauges, name, logfire.metric_gauge).set(value, attributes)
+
+
+def record(name: str, value: float, **attributes):
+    """Records a value, e.g. a duration, in the histogram with the given name."""
+    _get_instrument(_histograms, name, logfire.metric_histogram).record(value, attributes)
+
+
+def _get_instrument(instruments: dict, name: str, factory):
+    with _lock:
+        if name not in instruments:
+            instruments[name] = factory(name)
+        return instruments[name]
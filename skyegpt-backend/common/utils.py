@@ -66,6 +66,11 @@ def generate_local_folder_path_from_skye_version(skye_major_version: str) -> str
     )
 
 
+def generate_skye_doc_collection_name(skye_major_version: str) -> str:
+    """Render the vector database collection name holding the docs of a given Skye major version."""
+    return replace_placeholders(constants.SKYE_DOC_COLLECTION_NAME_TEMPLATE, {"skye_major_version": skye_major_version})
+
+
 def calculate_utc_x_hours_ago(x_hours: int) -> datetime:
     """Return the UTC datetime representing *x_hours* ago from now."""
     now_utc = datetime.now(timezone.utc)
@@ -0,0 +1,95 @@
+"""Keeps track of what every imported file contributed to a collection, so re-imports can be incremental.
+
+The manifest of a collection is a JSON file mapping the relative path of every imported file to the hash of
+its content and the ids of the chunks (and parent sections) created from it. Chunk ids are derived from the
+import settings, the file and the chunk content, so an unchanged chunk always gets the same id.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+from common import constants
+
+MANIFEST_VERSION = 1
+
+
+def load_manifest(collection_name: str) -> Optional[dict]:
+    """Return the stored manifest of the collection, or None if there is none."""
+    manifest_path = _manifest_path(collection_name)
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(collection_name: str, settings_fingerprint: str, files: Dict[str, dict]) -> None:
+    """Write the manifest of the collection, replacing the previous one atomically."""
+    manifest_path = _manifest_path(collection_name)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = manifest_path.with_suffix(".tmp")
+    with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(
+            {"version": MANIFEST_VERSION, "settings_fingerprint": settings_fingerprint, "files": files}, manifest_file
+        )
+    os.replace(temporary_path, manifest_path)
+
+
+def is_manifest_usable(manifest: Optional[dict], settings_fingerprint: str, number_of_documents: int) -> bool:
+    """Check that the manifest was written with the same settings and still describes the collection.
+
+    A collection that was deleted or written to outside the incremental import no longer matches the
+    number of chunk ids recorded in the manifest.
+    """
+    if manifest is None or manifest.get("settings_fingerprint") != settings_fingerprint:
+        return False
+    recorded_chunks = sum(len(entry["chunk_ids"]) for entry in manifest["files"].values())
+    return recorded_chunks == number_of_documents
+
+
+def settings_fingerprint(
+    markdown_split_headers: List[str], parent_document_retrieval: bool, base_metadata: dict
+) -> str:
+    """Hash the import settings that change how files are chunked and which metadata the chunks get."""
+    settings = {
+        "markdown_split_headers": sorted(markdown_split_headers),
+        "parent_document_retrieval": parent_document_retrieval,
+        "child_chunk_size": constants.CHILD_CHUNK_SIZE,
+        "child_chunk_overlap": constants.CHILD_CHUNK_OVERLAP,
+        "base_metadata": base_metadata,
+    }
+    return _hash(json.dumps(settings, sort_keys=True))
+
+
+def file_content_hash(file_path: Path) -> str:
+    """Hash the content of a file."""
+    with open(file_path, "rb") as opened_file:
+        return hashlib.sha256(opened_file.read()).hexdigest()
+
+
+def chunk_ids(scope: str, texts: List[str]) -> List[str]:
+    """Return a deterministic id for every text, unique within the scope even if texts repeat.
+
+    Args:
+        scope: identifies where the texts come from, e.g. the settings fingerprint and relative file path
+        texts: the chunk contents
+    """
+    occurrences: Dict[str, int] = {}
+    ids = []
+    for text in texts:
+        occurrence = occurrences.get(text, 0)
+        occurrences[text] = occurrence + 1
+        ids.append(_hash(f"{scope}\x1f{occurrence}\x1f{text}")[:32])
+    return ids
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _manifest_path(collection_name: str) -> Path:
+    return Path(constants.IMPORT_MANIFEST_FOLDER_LOCATION) / f"{collection_name}.json"
@@ -1,59 +1,353 @@
 """Holds a service that orchestrates finding files and saving them to vector db."""
 
-from langchain_text_splitters import MarkdownHeaderTextSplitter
+from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
 from pathlib import Path
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional, Mapping, Tuple, Union
 from database import vectordb_client
-import uuid
+from common.exceptions import CollectionNotFoundError
 import os
+import signal
 import time
 import multiprocessing as mp
+from queue import Empty, Full
 from ..utils.process_wrapper import create_process, start_process, join_process
 from ..utils import documentation_link_generator
+from . import import_manifest
+from common import constants
 
 
 def scan_and_import_markdowns_from_folder(
-    collection_name: str, folder_path: str, markdown_split_headers: List[str]
+    collection_name: str,
+    folder_path: str,
+    markdown_split_headers: List[str],
+    base_metadata: Optional[Mapping[str, Union[str, int, float, bool]]] = None,
+    parent_document_retrieval: bool = False,
+    index_configuration: Optional[dict] = None,
 ) -> None:
-    """Finds .md files in local storage and saves them vector database."""
-    vectordb_client.create_collection_if_needed(collection_name)
+    """Finds .md files in local storage and saves them vector database.
+
+    The import is incremental: files whose content did not change since the last import are skipped, only new
+    or changed chunks of the other files are written and chunks that disappeared are deleted. What every file
+    contributed is stored in the import manifest of the collection. Without a usable manifest the collection
+    is emptied and fully imported.
+
+    Args:
+        collection_name: name of the collection to import to, created if needed
+        folder_path: folder scanned recursively for .md files
+        markdown_split_headers: header levels to split the documents at
+        base_metadata: metadata added to every chunk, e.g. the Skye version of the documentation
+        parent_document_retrieval: if True, the header sections are stored in the parent collection and only
+            their small child chunks are embedded in the collection. Each child points to its section
+            with the parent_id metadata.
+        index_configuration: HNSW index parameters of the collection if it is created, see
+            vectordb_client.create_collection_if_needed
+    """
+    base_metadata = dict(base_metadata or {})
+    vectordb_client.create_collection_if_needed(collection_name, index_configuration)
+    if parent_document_retrieval:
+        vectordb_client.create_collection_if_needed(vectordb_client.parent_collection_name(collection_name))
+
+    settings_fingerprint = import_manifest.settings_fingerprint(
+        markdown_split_headers, parent_document_retrieval, base_metadata
+    )
+    previous_manifest = import_manifest.load_manifest(collection_name)
+    number_of_documents = vectordb_client.number_of_documents_in_collection(collection_name)
+    if import_manifest.is_manifest_usable(previous_manifest, settings_fingerprint, number_of_documents):
+        previous_files = previous_manifest["files"]
+    else:
+        previous_files = {}
+        if number_of_documents > 0 or previous_manifest is not None:
+            print(f"No usable import manifest for {collection_name}, re-importing it from scratch")
+            _reset_collections(collection_name, parent_document_retrieval, index_configuration)
+
+    folder = Path(folder_path)
+    current_file_hashes = {
+        file.relative_to(folder).as_posix(): import_manifest.file_content_hash(file)
+        for file in sorted(folder.rglob("*.md"))
+    }
+    changed_files = [
+        (relative_path, content_hash, previous_files.get(relative_path))
+        for relative_path, content_hash in current_file_hashes.items()
+        if previous_files.get(relative_path, {}).get("content_hash") != content_hash
+    ]
+    removed_files = [relative_path for relative_path in previous_files if relative_path not in current_file_hashes]
+    for relative_path in removed_files:
+        entry = previous_files[relative_path]
+        _delete_chunks(collection_name, entry["chunk_ids"], entry["parent_ids"])
 
     batch_size = int(os.getenv("RAG_BATCH_SIZE"))
-    queue = mp.Queue()
+    number_of_writers = int(os.getenv("RAG_WRITER_PROCESSES", constants.IMPORT_WRITER_PROCESSES))
+    writer_batch_size = int(os.getenv("RAG_WRITER_BATCH_SIZE", batch_size))
+    number_of_parsers = int(os.getenv("RAG_PARSER_PROCESSES", os.cpu_count() or 1))
+    queue = mp.Queue(maxsize=number_of_writers * constants.IMPORT_QUEUE_BATCHES_PER_WRITER)
+    manifest_queue = mp.Queue()
+    progress_queue = mp.Queue()
 
     producer_process = create_process(
-        target=_chroma_import_producer, args=(folder_path, markdown_split_headers, batch_size, queue)
+        target=_chroma_import_producer,
+        args=(
+            folder_path,
+            changed_files,
+            markdown_split_headers,
+            batch_size,
+            queue,
+            manifest_queue,
+            base_metadata,
+            parent_document_retrieval,
+            settings_fingerprint,
+            number_of_parsers,
+        ),
     )
 
-    consumer_process = create_process(target=_chroma_import_consumer, args=(collection_name, queue))
+    consumer_processes = [
+        create_process(target=_chroma_import_consumer, args=(collection_name, queue, progress_queue, writer_batch_size))
+        for _ in range(number_of_writers)
+    ]
 
     start_time = time.time()
     start_process(producer_process)
-    start_process(consumer_process)
+    for consumer_process in consumer_processes:
+        start_process(consumer_process)
+
+    progress = _ImportProgress()
+    changed_file_entries = _supervise_import(
+        producer_process, consumer_processes, queue, manifest_queue, progress_queue, progress
+    )
 
     join_process(producer_process)
-    queue.put(None)
+    for consumer_process in consumer_processes:
+        join_process(consumer_process)
 
-    join_process(consumer_process)
+    all_processes_succeeded = all(process.exitcode == 0 for process in [producer_process, *consumer_processes])
+    if all_processes_succeeded and changed_file_entries is not None:
+        files = {
+            relative_path: previous_files[relative_path]
+            for relative_path in current_file_hashes
+            if relative_path not in changed_file_entries
+        }
+        files.update(changed_file_entries)
+        import_manifest.save_manifest(collection_name, settings_fingerprint, files)
+    else:
+        print(f"Import of {collection_name} did not finish cleanly, its import manifest was not updated")
 
+    elapsed_seconds = time.time() - start_time
     number_of_documents = vectordb_client.number_of_documents_in_collection(collection_name)
-    print(f"Elapsed seconds: {time.time()-start_time:.0f} Record count: {number_of_documents}")
+    print(
+        f"Elapsed seconds: {elapsed_seconds:.0f} Record count: {number_of_documents} "
+        f"Written documents: {progress.documents_written} "
+        f"Docs/sec: {progress.documents_written / max(elapsed_seconds, 0.001):.1f} Writers: {number_of_writers} "
+        f"Changed files: {len(changed_files)} Unchanged files: {len(current_file_hashes) - len(changed_files)} "
+        f"Removed files: {len(removed_files)}"
+    )
 
 
-def _chroma_import_producer(folder_path: str, markdown_split_headers: List[str], batch_size: int, queue):
-    folder = Path(folder_path)
-    for file in folder.rglob("*.md"):
-        with open(file, "r", encoding="utf-8") as opened_file:
-            documentation_source = documentation_link_generator.select_doc_source_by_folder_path(file)
+def _reset_collections(collection_name: str, parent_document_retrieval: bool, index_configuration: Optional[dict]):
+    parent_collection_name = vectordb_client.parent_collection_name(collection_name)
+    for name in (collection_name, parent_collection_name):
+        try:
+            vectordb_client.delete_collection(name)
+        except CollectionNotFoundError:
+            pass
+    vectordb_client.create_collection_if_needed(collection_name, index_configuration)
+    if parent_document_retrieval:
+        vectordb_client.create_collection_if_needed(parent_collection_name)
+
+
+def _supervise_import(
+    producer_process, consumer_processes: list, queue, manifest_queue, progress_queue, progress: "_ImportProgress"
+) -> Optional[Dict[str, dict]]:
+    """Reports the progress of the writers until they stopped and returns the manifest entries of the changed files.
+
+    Once the producer finished, every writer gets a stop signal. If all writers died, the producer is stopped
+    too, as nobody would empty the bounded queue. Returns None if the producer died without sending the entries.
+    """
+    changed_file_entries = None
+    producer_finished = False
+    while any(process.is_alive() for process in consumer_processes):
+        progress.receive(progress_queue, timeout=0.5)
+        if changed_file_entries is None:
+            changed_file_entries = _get_without_waiting(manifest_queue)
+        if not producer_finished and not producer_process.is_alive():
+            producer_finished = True
+            if changed_file_entries is None:
+                changed_file_entries = _get_without_waiting(manifest_queue, timeout=1)
+            for _ in consumer_processes:
+                _put_stop_signal(queue, consumer_processes)
+
+    progress.receive(progress_queue, timeout=0)
+    if producer_process.is_alive():
+        print("All import writers stopped, stopping the producer")
+        producer_process.terminate()
+    return changed_file_entries
+
+
+def _get_without_waiting(queue, timeout: float = 0):
+    try:
+        return queue.get(timeout=timeout) if timeout else queue.get_nowait()
+    except Empty:
+        return None
+
+
+def _put_stop_signal(queue, consumer_processes: list):
+    while any(process.is_alive() for process in consumer_processes):
+        try:
+            queue.put(None, timeout=1)
+            return
+        except Full:
+            continue
+
+
+class _ImportProgress:
+    """Reports written batches in the order they were produced, although parallel writers finish them unordered."""
+
+    def __init__(self):
+        self.documents_written = 0
+        self._completed_batches: Dict[int, int] = {}
+        self._next_batch_to_report = 1
+
+    def receive(self, progress_queue, timeout: float):
+        """Collect the completed batches from the writers and report the ones that are next in order."""
+        completed_batch = _get_without_waiting(progress_queue, timeout)
+        while completed_batch is not None:
+            sequence_number, number_of_documents = completed_batch
+            self._completed_batches[sequence_number] = number_of_documents
+            self.documents_written += number_of_documents
+            completed_batch = _get_without_waiting(progress_queue)
+
+        while self._next_batch_to_report in self._completed_batches:
+            number_of_documents = self._completed_batches.pop(self._next_batch_to_report)
+            print(f"Saved batch: {self._next_batch_to_report} with {number_of_documents} documents")
+            self._next_batch_to_report += 1
+
+
+class _SequencedQueue:
+    """Numbers the batches put on the import queue, so their completion can be reported in order.
+
+    The counter is shared by all parser processes, so the numbers are unique across them.
+    """
+
+    def __init__(self, queue, sequence_counter):
+        self._queue = queue
+        self._sequence_counter = sequence_counter
+
+    def put(self, batch: dict):
+        with self._sequence_counter.get_lock():
+            self._sequence_counter.value += 1
+            sequence_number = self._sequence_counter.value
+        self._queue.put({**batch, "sequence_number": sequence_number})
+
+
+def _chroma_import_producer(
+    folder_path: str,
+    changed_files: List[Tuple[str, str, Optional[dict]]],
+    markdown_split_headers: List[str],
+    batch_size: int,
+    queue,
+    manifest_queue,
+    base_metadata: dict,
+    parent_document_retrieval: bool,
+    settings_fingerprint: str,
+    number_of_parsers: int,
+):
+    """Parses and splits the changed files in a pool of parser processes that feed the import queue.
+
+    Sends the manifest entries of the changed files to manifest_queue once all of them are queued. When the
+    producer is terminated (all writers died), the pool is terminated with it instead of leaving its workers
+    blocked on the full queue.
+    """
+    parser_settings = {
+        "folder_path": folder_path,
+        "markdown_split_headers": markdown_split_headers,
+        "batch_size": batch_size,
+        "base_metadata": base_metadata,
+        "parent_document_retrieval": parent_document_retrieval,
+        "settings_fingerprint": settings_fingerprint,
+    }
+    sequence_counter = mp.Value("i", 0)
+    start_time = time.time()
+    changed_file_entries = {}
+    if changed_files:
+        signal.signal(signal.SIGTERM, _exit_on_terminate)
+        with mp.Pool(
+            processes=min(number_of_parsers, len(changed_files)),
+            initializer=_init_parser_process,
+            initargs=(parser_settings, queue, sequence_counter),
+        ) as pool:
+            for relative_path, entry in pool.imap_unordered(
+                _import_file, changed_files, chunksize=constants.IMPORT_PARSER_FILES_PER_TASK
+            ):
+                changed_file_entries[relative_path] = entry
+            # leaving the block terminates the workers, which would drop batches they did not flush to the queue yet
+            pool.close()
+            pool.join()
+
+    elapsed_seconds = time.time() - start_time
+    print(
+        f"Parsed files: {len(changed_files)} Parsers: {number_of_parsers} "
+        f"Files/sec: {len(changed_files) / max(elapsed_seconds, 0.001):.1f}"
+    )
+    manifest_queue.put(changed_file_entries)
 
-            file_content = opened_file.read()
-            texts = _split_markdown_by_headers(file_content, markdown_split_headers)
 
-            _add_text_to_queue(texts, Path(file.name).stem, documentation_source, batch_size, queue)
+_parser_settings: dict = {}
+_parser_queue: Optional[_SequencedQueue] = None
+
+
+def _exit_on_terminate(signal_number, frame):
+    # unwinds the with block of the pool, which terminates the parser processes
+    raise SystemExit(1)
+
+
+def _init_parser_process(parser_settings: dict, queue, sequence_counter):
+    global _parser_settings, _parser_queue
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _parser_settings = parser_settings
+    _parser_queue = _SequencedQueue(queue, sequence_counter)
+
+
+def _import_file(changed_file: Tuple[str, str, Optional[dict]]) -> Tuple[str, dict]:
+    """Splits one file, queues its new chunks and the deletion of its stale ones and returns its manifest entry."""
+    relative_path, content_hash, previous_entry = changed_file
+    settings = _parser_settings
+    file = Path(settings["folder_path"]) / relative_path
+    with open(file, "r", encoding="utf-8") as opened_file:
+        file_content = opened_file.read()
+    documentation_source = documentation_link_generator.select_doc_source_by_folder_path(file)
+    texts = _split_markdown_by_headers(file_content, settings["markdown_split_headers"])
+
+    file_name = Path(file.name).stem
+    scope = f"{settings['settings_fingerprint']}/{relative_path}"
+    previous_entry = previous_entry or {"chunk_ids": [], "parent_ids": []}
+    add_to_queue = _add_sections_with_children_to_queue if settings["parent_document_retrieval"] else _add_text_to_queue
+    entry = add_to_queue(
+        texts,
+        file_name,
+        documentation_source,
+        settings["batch_size"],
+        _parser_queue,
+        settings["base_metadata"],
+        scope,
+        previous_entry,
+    )
+
+    stale_chunk_ids = sorted(set(previous_entry["chunk_ids"]) - set(entry["chunk_ids"]))
+    stale_parent_ids = sorted(set(previous_entry["parent_ids"]) - set(entry["parent_ids"]))
+    if stale_chunk_ids or stale_parent_ids:
+        _parser_queue.put({"delete": {"ids": stale_chunk_ids, "parent_ids": stale_parent_ids}})
+    return relative_path, {"content_hash": content_hash, **entry}
 
 
 def _split_markdown_by_headers(file_content: str, markdown_split_headers: List[str]):
+    markdown_splitter = _markdown_splitter(tuple(markdown_split_headers))
+    documents = markdown_splitter.split_text(file_content)
+    document_contents = [document.page_content for document in documents]
+    return document_contents
 
+
+@lru_cache
+def _markdown_splitter(markdown_split_headers: Tuple[str, ...]) -> MarkdownHeaderTextSplitter:
+    """Build the splitter once per process, as parsing calls it for every file."""
     split_levels_list = []
     if "#" in markdown_split_headers:
         split_levels_list.append(("#", "Header 1"))
@@ -61,25 +355,49 @@ def _split_markdown_by_headers(file_content: str, markdown_split_headers: List[s
         split_levels_list.append(("##", "Header 2"))
     if "###" in markdown_split_headers:
         split_levels_list.append(("###", "Header 3"))
+    return MarkdownHeaderTextSplitter(split_levels_list, strip_headers=False)
 
-    markdown_splitter = MarkdownHeaderTextSplitter(split_levels_list, strip_headers=False)
-    documents = markdown_splitter.split_text(file_content)
-    document_contents = [document.page_content for document in documents]
-    return document_contents
+
+def _split_section_into_children(section: str) -> List[str]:
+    return _child_splitter().split_text(section)
+
+
+@lru_cache
+def _child_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=constants.CHILD_CHUNK_SIZE, chunk_overlap=constants.CHILD_CHUNK_OVERLAP
+    )
 
 
 def _add_text_to_queue(
-    content_text_array: List[str], file_name: str, documentation_source: str, batch_size: int, queue
-):
+    content_text_array: List[str],
+    file_name: str,
+    documentation_source: str,
+    batch_size: int,
+    queue,
+    base_metadata: dict,
+    scope: str,
+    previous_entry: dict,
+) -> dict:
+    """Queues the texts that were not imported before and returns the manifest entry of the file."""
     documents = []
     metadatas = []
     ids = []
+    chunk_ids = import_manifest.chunk_ids(scope, content_text_array)
+    previous_chunk_ids = set(previous_entry["chunk_ids"])
 
-    for text in content_text_array:
+    for text, chunk_id in zip(content_text_array, chunk_ids):
+        if chunk_id in previous_chunk_ids:
+            continue
         documentation_link = documentation_link_generator.link_generator(file_name, documentation_source)
-        metadata = {"file_name": file_name, "documentation_link": documentation_link}
+        metadata = {
+            **base_metadata,
+            "file_name": file_name,
+            "documentation_link": documentation_link,
+            "source": documentation_source,
+        }
 
-        ids.append(str(uuid.uuid4()))
+        ids.append(chunk_id)
         documents.append(text)
         metadatas.append(metadata)
 
@@ -91,20 +409,101 @@ def _add_text_to_queue(
 
     if len(ids) > 0:
         queue.put({"documents": documents, "metadatas": metadatas, "ids": ids})
+    return {"chunk_ids": chunk_ids, "parent_ids": []}
+
+
+def _add_sections_with_children_to_queue(
+    sections: List[str],
+    file_name: str,
+    documentation_source: str,
+    batch_size: int,
+    queue,
+    base_metadata: dict,
+    scope: str,
+    previous_entry: dict,
+) -> dict:
+    """Queues the sections as parents and their child chunks as searchable documents.
+
+    Sections imported before are skipped together with their children, as the ids of the children derive
+    from the id of their section. A batch is flushed once it holds batch_size children. Parents travel in
+    the batch of their children, so a child is never written before the section it points to.
+
+    Returns:
+        dict: the manifest entry of the file with the ids of all its sections and children.
+    """
+    documentation_link = documentation_link_generator.link_generator(file_name, documentation_source)
+    section_metadata = {
+        **base_metadata,
+        "file_name": file_name,
+        "documentation_link": documentation_link,
+        "source": documentation_source,
+    }
+    previous_parent_ids = set(previous_entry["parent_ids"])
+    parent_ids = import_manifest.chunk_ids(scope, sections)
+    all_child_ids = []
+    batch = _empty_parent_child_batch()
+
+    for section, parent_id in zip(sections, parent_ids):
+        children = _split_section_into_children(section)
+        child_ids = import_manifest.chunk_ids(f"{scope}/{parent_id}", children)
+        all_child_ids.extend(child_ids)
+        if parent_id in previous_parent_ids:
+            continue
+
+        batch["parents"]["ids"].append(parent_id)
+        batch["parents"]["documents"].append(section)
+        batch["parents"]["metadatas"].append(section_metadata)
 
+        for child, child_id in zip(children, child_ids):
+            batch["ids"].append(child_id)
+            batch["documents"].append(child)
+            batch["metadatas"].append({**section_metadata, "parent_id": parent_id})
 
-def _chroma_import_consumer(collection_name, queue):
-    batch_number = 0
+        if len(batch["ids"]) >= batch_size:
+            queue.put(batch)
+            batch = _empty_parent_child_batch()
+
+    if len(batch["ids"]) > 0 or len(batch["parents"]["ids"]) > 0:
+        queue.put(batch)
+    return {"chunk_ids": all_child_ids, "parent_ids": parent_ids}
+
+
+def _empty_parent_child_batch() -> dict:
+    return {"documents": [], "metadatas": [], "ids": [], "parents": {"documents": [], "metadatas": [], "ids": []}}
+
+
+def _chroma_import_consumer(collection_name, queue, progress_queue, writer_batch_size: int):
     while True:
-        batch_number += 1
         batch = queue.get()
         if batch is None:
             break
 
-        documents = batch["documents"]
-        metadatas = batch["metadatas"]
-        ids = batch["ids"]
-        print(f"Saving batch: {batch_number} with {len(ids)} documents")
-        vectordb_client.add_to_collection(
-            collection_name=collection_name, documents=documents, metadatas=metadatas, ids=ids
-        )
+        if "delete" in batch:
+            _delete_chunks(collection_name, batch["delete"]["ids"], batch["delete"]["parent_ids"])
+            progress_queue.put((batch["sequence_number"], 0))
+            continue
+
+        parents = batch.get("parents")
+        if parents and parents["ids"]:
+            vectordb_client.add_parent_sections_to_collection(
+                vectordb_client.parent_collection_name(collection_name),
+                documents=parents["documents"],
+                metadatas=parents["metadatas"],
+                ids=parents["ids"],
+            )
+        for start_index in range(0, len(batch["ids"]), writer_batch_size):
+            end_index = start_index + writer_batch_size
+            vectordb_client.add_to_collection(
+                collection_name=collection_name,
+                documents=batch["documents"][start_index:end_index],
+                metadatas=batch["metadatas"][start_index:end_index],
+                ids=batch["ids"][start_index:end_index],
+            )
+        progress_queue.put((batch["sequence_number"], len(batch["ids"])))
+
+
+def _delete_chunks(collection_name: str, chunk_ids: List[str], parent_ids: List[str]):
+    if chunk_ids:
+        vectordb_client.delete_from_collection(collection_name, chunk_ids)
+    if parent_ids:
+        vectordb_client.delete_from_collection(vectordb_client.parent_collection_name(collection_name), parent_ids)
@@ -1,45 +1,174 @@
 """HTTP-based ChromaDB client wrappers for managing collections and queries."""
 
 import chromadb
+import httpx
+import threading
+import time
 from functools import wraps
-from typing import Optional
+from typing import Optional, List
 from chromadb.errors import NotFoundError
-from chromadb import Collection, QueryResult
+from chromadb import Collection, QueryResult, GetResult
 from datetime import datetime
-from common.exceptions import ResponseGenerationError, CollectionNotFoundError
+from common import constants, logger, metrics
+from common.circuit_breaker import CircuitBreaker
+from common.exceptions import ResponseGenerationError, CollectionNotFoundError, VectorDBUnavailableError
 import os
 
 CHROMA_HOST = os.getenv("CHROMA_HOST", "chroma")
 CHROMA_PORT = os.getenv("CHROMA_PORT", 8000)
 
 _chroma_client: Optional[chromadb.HttpClient] = None
+_circuit_breaker = CircuitBreaker(
+    "vectordb", constants.VECTOR_DB_CIRCUIT_FAILURE_THRESHOLD, constants.VECTOR_DB_CIRCUIT_RESET_SECONDS
+)
+_guarded_call = threading.local()
+_health_probe_stop_event = threading.Event()
+_health_probe_thread: Optional[threading.Thread] = None
 
 
 def _init_client():
     """Create the real client only once."""
     global _chroma_client
     if _chroma_client is None:
-        _chroma_client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
+        try:
+            client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
+        except ValueError as e:
+            raise ConnectionError(str(e)) from e
+        _configure_http_session(client)
+        _chroma_client = client
     return _chroma_client
 
 
+def _forget_client_in_child_process() -> None:
+    """Let a forked process, e.g. an import writer, open its own connections instead of sharing the parent's."""
+    global _chroma_client
+    _chroma_client = None
+
+
+os.register_at_fork(after_in_child=_forget_client_in_child_process)
+
+
+def _configure_http_session(client) -> None:
+    """Replace the HTTP session of the client with one that has timeouts and a bounded keep-alive pool.
+
+    Chroma's HttpClient creates its httpx session without a timeout and does not expose the pool settings,
+    so a request to an unresponsive server would hang forever.
+    """
+    server = getattr(client, "_server", None)
+    previous_session = getattr(server, "_session", None)
+    if previous_session is None:
+        logger.warning("Chroma client internals changed, HTTP connection settings are not applied")
+        return
+    ssl_verify = server._settings.chroma_server_ssl_verify
+    server._session = httpx.Client(
+        timeout=httpx.Timeout(
+            constants.VECTOR_DB_READ_TIMEOUT_SECONDS, connect=constants.VECTOR_DB_CONNECT_TIMEOUT_SECONDS
+        ),
+        limits=httpx.Limits(
+            max_connections=constants.VECTOR_DB_MAX_CONNECTIONS,
+            max_keepalive_connections=constants.VECTOR_DB_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=constants.VECTOR_DB_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        headers=previous_session.headers,
+        verify=True if ssl_verify is None else ssl_verify,
+    )
+    previous_session.close()
+
+
 def ensure_client(func):
-    """Lazy setup for client. Mainly to avoid side effect connections during testing."""
+    """Lazy setup for client. Mainly to avoid side effect connections during testing.
+
+    Calls are guarded by the circuit breaker: while the database is unreachable they fail fast with
+    VectorDBUnavailableError instead of every caller waiting for the connection timeout.
+    """
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        _init_client()
-        return func(*args, **kwargs)
+        if getattr(_guarded_call, "active", False):
+            return func(*args, **kwargs)
+        if not _circuit_breaker.allow_request():
+            raise VectorDBUnavailableError(f"Vector database circuit is {_circuit_breaker.state.name}")
+
+        _guarded_call.active = True
+        try:
+            _init_client()
+            result = func(*args, **kwargs)
+        except (httpx.TransportError, ConnectionError) as e:
+            _circuit_breaker.record_failure()
+            raise VectorDBUnavailableError(f"Vector database is unreachable: {e}") from e
+        except Exception:
+            # the database answered, e.g. that a collection does not exist
+            _circuit_breaker.record_success()
+            raise
+        finally:
+            _guarded_call.active = False
+        _circuit_breaker.record_success()
+        return result
 
     return wrapper
 
 
+def probe_health() -> bool:
+    """Send a heartbeat to the database and update the circuit breaker with the outcome.
+
+    The probe bypasses the breaker, so it is also the call that closes it once the database is back.
+    """
+    start_time = time.perf_counter()
+    try:
+        _init_client().heartbeat()
+    except (httpx.HTTPError, ConnectionError) as e:
+        logger.warning(f"Vector database health probe failed: {e}")
+        _circuit_breaker.record_failure()
+        metrics.set_gauge("vectordb.health_probe.up", 0)
+        return False
+    metrics.record("vectordb.health_probe.latency_ms", (time.perf_counter() - start_time) * 1000)
+    metrics.set_gauge("vectordb.health_probe.up", 1)
+    _circuit_breaker.record_success()
+    return True
+
+
+def start_health_probe(interval_seconds: float) -> None:
+    """Start probing the database health every interval_seconds in a daemon thread, if not running yet."""
+    global _health_probe_thread
+    if _health_probe_thread is not None and _health_probe_thread.is_alive():
+        return
+    _health_probe_stop_event.clear()
+    _health_probe_thread = threading.Thread(
+        target=_run_health_probe, args=(interval_seconds,), name="vectordb-health-probe", daemon=True
+    )
+    _health_probe_thread.start()
+
+
+def stop_health_probe() -> None:
+    """Stop the health probe thread."""
+    _health_probe_stop_event.set()
+    if _health_probe_thread is not None:
+        _health_probe_thread.join()
+
+
+def _run_health_probe(interval_seconds: float) -> None:
+    while not _health_probe_stop_event.is_set():
+        probe_health()
+        _health_probe_stop_event.wait(interval_seconds)
+
+
 @ensure_client
-def create_collection_if_needed(collection_name: str) -> Collection:
-    """Get or create a ChromaDB collection by name."""
-    return _chroma_client.get_or_create_collection(
-        collection_name, metadata={"description": "ChromaDB for GPT purposes", "created": str(datetime.now())}
+def create_collection_if_needed(collection_name: str, hnsw_configuration: Optional[dict] = None) -> Collection:
+    """Get or create a ChromaDB collection by name.
+
+    The HNSW build parameters (space, max_neighbors, ef_construction) only take effect when the collection is
+    created. The search parameter ef_search is also stored for an already existing collection, it is used once
+    the database loads the index again.
+    """
+    collection = _chroma_client.get_or_create_collection(
+        collection_name,
+        configuration=_to_collection_configuration(hnsw_configuration),
+        metadata={"description": "ChromaDB for GPT purposes", "created": str(datetime.now())},
     )
+    ef_search = (hnsw_configuration or {}).get("ef_search")
+    if ef_search and get_hnsw_configuration(collection).get("ef_search") != ef_search:
+        update_ef_search(collection, ef_search)
+    return collection
 
 
 @ensure_client
@@ -64,13 +193,36 @@ def get_collection_by_name(collection_name: str):
 
 
 @ensure_client
-def create_collection(collection_name: str):
-    """Create a new collection with the given name."""
+def create_collection(collection_name: str, hnsw_configuration: Optional[dict] = None):
+    """Create a new collection with the given name and optional HNSW index parameters."""
     return _chroma_client.create_collection(
-        name=collection_name, metadata={"description": "ChromaDB for GPT purposes", "created": str(datetime.now())}
+        name=collection_name,
+        configuration=_to_collection_configuration(hnsw_configuration),
+        metadata={"description": "ChromaDB for GPT purposes", "created": str(datetime.now())},
     )
 
 
+def update_ef_search(collection: Collection, ef_search: int) -> None:
+    """Change the size of the candidate list searched by the HNSW index, used once the index is loaded again."""
+    collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+
+
+def get_hnsw_configuration(collection: Collection) -> dict:
+    """Return the HNSW index parameters of the collection."""
+    return (collection.configuration_json or {}).get("hnsw") or {}
+
+
+def _to_collection_configuration(hnsw_configuration: Optional[dict]) -> Optional[dict]:
+    hnsw_parameters = {key: value for key, value in (hnsw_configuration or {}).items() if value is not None}
+    return {"hnsw": hnsw_parameters} if hnsw_parameters else None
+
+
+@ensure_client
+def list_collection_names() -> List[str]:
+    """Return the names of all collections in the database."""
+    return [collection.name for collection in _chroma_client.list_collections()]
+
+
 @ensure_client
 def delete_collection(collection_name: str):
     """Delete the collection with the specified name."""
@@ -81,16 +233,46 @@ def delete_collection(collection_name: str):
 
 
 @ensure_client
-def find_k_nearest_neighbour(collection: Collection, query: str, k: int) -> QueryResult:
-    """Find the k nearest neighbours in the collection for the given query."""
-    results = collection.query(query_texts=[query], n_results=k)
+def find_k_nearest_neighbour(
+    collection: Collection, query: str, k: int, include_embeddings: bool = False
+) -> QueryResult:
+    """Find the k nearest neighbours in the collection for the given query.
+
+    Embeddings of the neighbours are only returned when include_embeddings is set, as they are large.
+    """
+    include = ["documents", "metadatas", "distances"]
+    if include_embeddings:
+        include.append("embeddings")
+    results = collection.query(query_texts=[query], n_results=k, include=include)
     return results
 
 
+def get_distance_space(collection: Collection) -> str:
+    """Return the distance function ('l2', 'cosine' or 'ip') the collection's index was built with."""
+    hnsw_configuration = get_hnsw_configuration(collection)
+    legacy_metadata = collection.metadata or {}
+    return hnsw_configuration.get("space") or legacy_metadata.get("hnsw:space") or "l2"
+
+
+@ensure_client
+def add_to_collection(collection, documents, metadatas, ids, embeddings=None):
+    """Add documents with metadata and ids to the specified collection, replacing documents with the same id.
+
+    If embeddings are not given, Chroma computes them with the collection's embedding function.
+    """
+    collection.upsert(documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings)
+
+
+@ensure_client
+def delete_from_collection(collection: Collection, ids: List[str]) -> None:
+    """Delete the documents with the given ids from the collection."""
+    collection.delete(ids=ids)
+
+
 @ensure_client
-def add_to_collection(collection, documents, metadatas, ids):
-    """Add documents with metadata and ids to the specified collection."""
-    collection.add(documents=documents, metadatas=metadatas, ids=ids)
+def get_by_ids(collection: Collection, ids: List[str]) -> GetResult:
+    """Fetch the documents and metadata of the given ids in one request."""
+    return collection.get(ids=ids, include=["documents", "metadatas"])
 
 
 @ensure_client
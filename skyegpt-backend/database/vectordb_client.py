@@ -1,12 +1,18 @@
 """HTTP-based VectorDB client wrappers for managing collections and queries."""
 
 from common.exceptions import VectorDBError, CollectionNotFoundError
-from common import logger, constants
+from common import logger, constants, utils
 from chromadb.errors import ChromaError
 from functools import wraps
 from .chroma_specific import chroma_client
-from typing import List, Mapping, Union
+from typing import List, Mapping, Optional, Union
 from chromadb import QueryResult
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+_fan_out_executor = ThreadPoolExecutor(
+    max_workers=constants.VECTOR_FAN_OUT_MAX_WORKERS, thread_name_prefix="vectordb-fan-out"
+)
 
 
 def convert_chroma_error_to_vectordb_error(func):
@@ -26,14 +32,33 @@ def convert_chroma_error_to_vectordb_error(func):
     return wrapper
 
 
+def start_health_probe() -> None:
+    """Starts probing the database in the background, so an outage opens the circuit breaker before queries hit it.
+
+    While the breaker is open, database calls fail fast with VectorDBUnavailableError. The first successful
+    probe closes it again.
+    """
+    chroma_client.start_health_probe(constants.VECTOR_DB_HEALTH_PROBE_INTERVAL_SECONDS)
+
+
+def stop_health_probe() -> None:
+    """Stops the background database health probe."""
+    chroma_client.stop_health_probe()
+
+
 @convert_chroma_error_to_vectordb_error
-def create_collection_if_needed(collection_name: str) -> None:
+def create_collection_if_needed(collection_name: str, index_configuration: Optional[dict] = None) -> None:
     """Creates a collection if needed.
 
+    Args:
+        collection_name: name of the collection
+        index_configuration: HNSW index parameters (space, max_neighbors, ef_construction, ef_search).
+            Omitted parameters use the database defaults. Only ef_search is stored for an existing collection.
+
     Raises:
         VectorDBError for database related errors
     """
-    chroma_client.create_collection_if_needed(collection_name)
+    chroma_client.create_collection_if_needed(collection_name, index_configuration)
 
 
 @convert_chroma_error_to_vectordb_error
@@ -51,13 +76,26 @@ def number_of_documents_in_collection(collection_name: str) -> int:
 
 
 @convert_chroma_error_to_vectordb_error
-def create_collection(collection_name: str) -> None:
-    """Creates a new collection in VectorDB.
+def create_collection(collection_name: str, index_configuration: Optional[dict] = None) -> None:
+    """Creates a new collection in VectorDB with optional HNSW index parameters.
 
     Raises:
         VectorDBError: for database related errors.
     """
-    return chroma_client.create_collection(collection_name)
+    return chroma_client.create_collection(collection_name, index_configuration)
+
+
+@convert_chroma_error_to_vectordb_error
+def update_index_search_ef(collection_name: str, ef_search: int) -> None:
+    """Changes the ef_search parameter of the collection's index, trading recall for query latency.
+
+    The database applies the new value once it loads the index again, e.g. after a restart.
+
+    Raises:
+        VectorDBError: for database related errors
+        CollectionNotFoundError: if collection is not found
+    """
+    chroma_client.update_ef_search(chroma_client.get_collection_by_name(collection_name), ef_search)
 
 
 @convert_chroma_error_to_vectordb_error
@@ -81,7 +119,7 @@ def add_to_collection(
     metadatas: List[Mapping[str, Union[str, int, float, bool]]],
     ids: List[str],
 ) -> None:
-    """Adds a document to the collection identified by name.
+    """Adds a document to the collection identified by name. Documents with an existing id are replaced.
 
     Args:
         collection_name: name of the collection
@@ -95,19 +133,300 @@ def add_to_collection(
     """
     try:
         collection = chroma_client.get_collection_by_name(collection_name)
-        collection.add(documents=documents, metadatas=metadatas, ids=ids)
+        chroma_client.add_to_collection(collection, documents, metadatas, ids)
+    except ValueError as e:
+        _handle_value_error(collection_name, e)
+
+
+@convert_chroma_error_to_vectordb_error
+def delete_from_collection(collection_name: str, ids: List[str]) -> None:
+    """Deletes the documents with the given ids from the collection identified by name.
+
+    Raises:
+        VectorDBError: for database related errors
+        CollectionNotFoundError: if collection is not found
+    """
+    try:
+        collection = chroma_client.get_collection_by_name(collection_name)
+        chroma_client.delete_from_collection(collection, ids)
+    except ValueError as e:
+        _handle_value_error(collection_name, e)
+
+
+@convert_chroma_error_to_vectordb_error
+def add_parent_sections_to_collection(
+    collection_name: str,
+    documents: List[str],
+    metadatas: List[Mapping[str, Union[str, int, float, bool]]],
+    ids: List[str],
+) -> None:
+    """Adds parent sections to a parent collection without embedding them.
+
+    Parent sections are only ever fetched by id, so a constant placeholder embedding is stored instead
+    of paying for a real one.
+
+    Raises:
+        VectorDBError: for database related errors
+        CollectionNotFoundError: if collection is not found
+    """
+    try:
+        collection = chroma_client.get_collection_by_name(collection_name)
+        placeholder_embeddings = [[0.0] for _ in ids]
+        chroma_client.add_to_collection(collection, documents, metadatas, ids, embeddings=placeholder_embeddings)
     except ValueError as e:
         _handle_value_error(collection_name, e)
 
 
-def find_related_documents_to_query(query: str):
-    """Retrieve related documents from the vector database for a given query."""
-    collection_name = constants.SKYE_DOC_COLLECTION_NAME
-    collection = chroma_client.get_collection_by_name(collection_name)
+def parent_collection_name(collection_name: str) -> str:
+    """Return the name of the collection holding the parent sections of a collection's child chunks."""
+    return collection_name + constants.PARENT_COLLECTION_NAME_SUFFIX
+
+
+def find_related_documents_to_query(
+    query: str,
+    skye_version: Optional[str] = None,
+    source: Optional[constants.DocumentationSourceType] = None,
+    use_mmr: bool = constants.VECTOR_MMR_ENABLED,
+    mmr_lambda: float = constants.VECTOR_MMR_LAMBDA,
+):
+    """Retrieve related documents from the vector database for a given query.
+
+    Only the collections matching the requested source and Skye version are searched. The results of
+    multiple collections are merged by similarity to the query.
+
+    Args:
+        query: the text to find related documents for
+        skye_version: Skye major version (e.g. "10.0"). Defaults to the latest imported version.
+        source: "skye" or "iph". Searches both sources if not given.
+        use_mmr: if True, over-fetches candidates and re-ranks them with maximal marginal relevance
+        mmr_lambda: trade-off between relevance (1.0) and diversity (0.0), only used with use_mmr
+    """
     number_of_results = constants.VECTOR_NUMBER_OF_RESULTS
+    collection_names = resolve_collection_names(skye_version, source)
+    return find_related_documents_in_collections(
+        query, collection_names, number_of_results, number_of_results, use_mmr, mmr_lambda
+    )
+
+
+def find_related_documents_in_collections(
+    query: str,
+    collection_names: List[str],
+    k_per_collection: int = constants.VECTOR_FAN_OUT_RESULTS_PER_COLLECTION,
+    number_of_results: int = constants.VECTOR_NUMBER_OF_RESULTS,
+    use_mmr: bool = constants.VECTOR_MMR_ENABLED,
+    mmr_lambda: float = constants.VECTOR_MMR_LAMBDA,
+):
+    """Query several collections concurrently and merge the results into one ranking.
+
+    Every collection is queried in its own thread, so the call takes as long as the slowest collection
+    instead of the sum of all. Distances are normalized to similarities using each collection's distance
+    space before merging, so collections built with different spaces are comparable. Missing collections
+    are skipped.
+
+    Args:
+        query: the text to find related documents for
+        collection_names: the collections to search in
+        k_per_collection: number of results fetched from each collection
+        number_of_results: number of results kept after merging
+        use_mmr: if True, every collection's results are re-ranked with maximal marginal relevance
+        mmr_lambda: trade-off between relevance (1.0) and diversity (0.0), only used with use_mmr
+    """
+    futures = [
+        _fan_out_executor.submit(_query_collection_by_name, name, query, k_per_collection, use_mmr, mmr_lambda)
+        for name in collection_names
+    ]
+    collection_results = [future.result() for future in futures]
+    found_results = [result for result in collection_results if result is not None]
+    return structure_result_as_pair(_merge_query_results(found_results, number_of_results))
+
+
+def resolve_collection_names(
+    skye_version: Optional[str] = None, source: Optional[constants.DocumentationSourceType] = None
+) -> List[str]:
+    """Return the names of the collections holding the requested documentation source and Skye version."""
+    collection_names = []
+    if source in (None, "skye"):
+        if skye_version:
+            collection_names.append(utils.generate_skye_doc_collection_name(skye_version))
+        else:
+            latest_collection_name = _find_latest_skye_doc_collection_name(chroma_client.list_collection_names())
+            if latest_collection_name:
+                collection_names.append(latest_collection_name)
+    if source in (None, "iph"):
+        collection_names.append(constants.IPH_DOC_COLLECTION_NAME)
+    return collection_names
+
+
+def _find_latest_skye_doc_collection_name(collection_names: List[str]) -> Optional[str]:
+    """Pick the Skye documentation collection with the highest major version, e.g. SkyeDoc-10.0 over SkyeDoc-9.16."""
+    prefix = constants.SKYE_DOC_COLLECTION_NAME_PREFIX
+    versioned_names = {}
+    for collection_name in collection_names:
+        version_parts = collection_name[len(prefix) :].split(".")
+        if collection_name.startswith(prefix) and all(part.isdigit() for part in version_parts):
+            versioned_names[tuple(int(part) for part in version_parts)] = collection_name
+    if not versioned_names:
+        return None
+    return versioned_names[max(versioned_names)]
+
 
-    result = chroma_client.find_k_nearest_neighbour(collection, query, number_of_results)
-    return structure_result_as_pair(result)
+@convert_chroma_error_to_vectordb_error
+def _query_collection_by_name(
+    collection_name: str, query: str, k: int, use_mmr: bool, mmr_lambda: float
+) -> Optional[QueryResult]:
+    """Query a collection by name. Returns None if the collection does not exist."""
+    try:
+        collection = chroma_client.get_collection_by_name(collection_name)
+    except CollectionNotFoundError:
+        logger.warning(f"Collection {collection_name} not found, skipping it in search")
+        return None
+    return _query_collection(collection, query, k, use_mmr, mmr_lambda)
+
+
+def _query_collection(collection, query: str, k: int, use_mmr: bool, mmr_lambda: float) -> QueryResult:
+    """Query a single collection, optionally re-ranked with MMR, and attach similarities to the result."""
+    space = chroma_client.get_distance_space(collection)
+    if use_mmr:
+        fetch_k = k * constants.VECTOR_MMR_FETCH_K_MULTIPLIER
+        result = chroma_client.find_k_nearest_neighbour(collection, query, fetch_k, include_embeddings=True)
+        result = rerank_with_mmr(result, k, mmr_lambda, space)
+    else:
+        result = chroma_client.find_k_nearest_neighbour(collection, query, k)
+
+    distances = _first_query_result(result.get("distances"))
+    if distances is not None:
+        result["similarities"] = [distances_to_similarities(np.asarray(distances, dtype=np.float32), space).tolist()]
+    return _replace_children_with_parents(collection, result)
+
+
+def _replace_children_with_parents(collection, result: QueryResult) -> QueryResult:
+    """Collapse child chunk hits to their unique parent sections, fetched with a single bulk get.
+
+    Parents keep the rank and similarity of their best child. At most VECTOR_MAX_PARENT_SECTIONS parents
+    are returned. Hits without a parent_id (collections imported without parents) are returned unchanged.
+    """
+    metadatas = _first_query_result(result.get("metadatas")) or []
+    if not any(metadata and "parent_id" in metadata for metadata in metadatas):
+        return result
+
+    similarities = _first_query_result(result.get("similarities")) or [0.0] * len(metadatas)
+    best_similarity_by_parent_id = {}
+    for metadata, similarity in zip(metadatas, similarities):
+        parent_id = metadata.get("parent_id")
+        if parent_id and parent_id not in best_similarity_by_parent_id:
+            best_similarity_by_parent_id[parent_id] = similarity
+            if len(best_similarity_by_parent_id) == constants.VECTOR_MAX_PARENT_SECTIONS:
+                break
+
+    parent_ids = list(best_similarity_by_parent_id)
+    parent_collection = chroma_client.get_collection_by_name(parent_collection_name(collection.name))
+    parents = chroma_client.get_by_ids(parent_collection, parent_ids)
+    parent_by_id = {
+        parent_id: (document, metadata)
+        for parent_id, document, metadata in zip(parents["ids"], parents["documents"], parents["metadatas"])
+    }
+
+    found_parent_ids = [parent_id for parent_id in parent_ids if parent_id in parent_by_id]
+    return {
+        "documents": [[parent_by_id[parent_id][0] for parent_id in found_parent_ids]],
+        "metadatas": [[parent_by_id[parent_id][1] for parent_id in found_parent_ids]],
+        "similarities": [[best_similarity_by_parent_id[parent_id] for parent_id in found_parent_ids]],
+    }
+
+
+def _merge_query_results(results: List[QueryResult], k: int) -> QueryResult:
+    """Merge per-collection query results into one, keeping the k most similar entries."""
+    if len(results) == 1:
+        return results[0]
+
+    entries = []
+    for result in results:
+        documents = _first_query_result(result.get("documents")) or []
+        metadatas = _first_query_result(result.get("metadatas")) or []
+        similarities = _first_query_result(result.get("similarities")) or [0.0] * len(documents)
+        entries.extend(zip(similarities, documents, metadatas))
+    entries.sort(key=lambda entry: entry[0], reverse=True)
+    top_entries = entries[:k]
+    return {
+        "documents": [[document for _, document, _ in top_entries]],
+        "metadatas": [[metadata for _, _, metadata in top_entries]],
+    }
+
+
+def rerank_with_mmr(result: QueryResult, k: int, mmr_lambda: float, space: str) -> QueryResult:
+    """Select a diverse top-k from an over-fetched query result using maximal marginal relevance.
+
+    The result must contain embeddings and distances. The returned QueryResult keeps the original
+    nested shape (one inner list per query) so it can be passed to structure_result_as_pair.
+    """
+    embeddings = _first_query_result(result.get("embeddings"))
+    distances = _first_query_result(result.get("distances"))
+    if embeddings is None or distances is None or len(distances) == 0:
+        return result
+
+    query_similarities = distances_to_similarities(np.asarray(distances, dtype=np.float32), space)
+    selected = maximal_marginal_relevance(query_similarities, np.asarray(embeddings, dtype=np.float32), k, mmr_lambda)
+
+    reranked = {}
+    for key in ("ids", "documents", "metadatas", "distances"):
+        values = _first_query_result(result.get(key))
+        if values is not None:
+            reranked[key] = [[values[index] for index in selected]]
+    return reranked
+
+
+def maximal_marginal_relevance(
+    query_similarities: np.ndarray, embeddings: np.ndarray, k: int, mmr_lambda: float
+) -> List[int]:
+    """Greedily pick k candidate indices maximising lambda * relevance - (1 - lambda) * redundancy.
+
+    Redundancy is the highest cosine similarity to an already selected candidate. The pairwise
+    similarity matrix is computed once, then every step is a single vectorized update, so the cost
+    is one (n x d) @ (d x n) product plus k passes over an n-long vector.
+
+    Args:
+        query_similarities: similarity of each candidate to the query, shape (n,)
+        embeddings: candidate embeddings, shape (n, d)
+        k: number of candidates to select
+        mmr_lambda: trade-off between relevance (1.0) and diversity (0.0)
+
+    Returns:
+        List[int]: indices of the selected candidates in selection order
+    """
+    number_of_candidates = len(query_similarities)
+    k = min(k, number_of_candidates)
+    if k <= 0:
+        return []
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normalized = embeddings / np.where(norms == 0, 1.0, norms)
+    pairwise_similarities = normalized @ normalized.T
+
+    relevance = mmr_lambda * query_similarities
+    max_redundancy = np.full(number_of_candidates, -np.inf, dtype=np.float32)
+    is_selected = np.zeros(number_of_candidates, dtype=bool)
+
+    selected = [int(np.argmax(query_similarities))]
+    is_selected[selected[0]] = True
+    for _ in range(k - 1):
+        np.maximum(max_redundancy, pairwise_similarities[selected[-1]], out=max_redundancy)
+        scores = relevance - (1 - mmr_lambda) * max_redundancy
+        scores[is_selected] = -np.inf
+        next_index = int(np.argmax(scores))
+        selected.append(next_index)
+        is_selected[next_index] = True
+    return selected
+
+
+def distances_to_similarities(distances: np.ndarray, space: str) -> np.ndarray:
+    """Convert Chroma distances to similarities comparable with cosine similarity.
+
+    Chroma returns squared L2 for 'l2', 1 - cosine for 'cosine' and 1 - dot product for 'ip'.
+    The default embedding function produces unit vectors, for which squared L2 equals 2 - 2 * cosine.
+    """
+    if space == "l2":
+        return 1.0 - distances / 2.0
+    return 1.0 - distances
 
 
 def structure_result_as_pair(result: QueryResult):
@@ -127,6 +446,13 @@ def _flatten_list(nested_list: list):
         return nested_list[0]
 
 
+def _first_query_result(nested_values):
+    """Return the results of the first (and only) query, also for numpy arrays returned by Chroma."""
+    if nested_values is None or len(nested_values) == 0:
+        return None
+    return nested_values[0]
+
+
 def _pair_document_with_metadata(documents: list, metadatas: list):
     return [{"document": doc, "metadata": meta} for doc, meta in zip(documents, metadatas)]
 
@@ -0,0 +1,135 @@
+"""Benchmark of the HNSW ef_search parameter: recall against exact search and query latency.
+
+Embeds the questions of the question bank, computes their exact nearest neighbours over every embedding of
+the collection, then queries an HNSW index built with each ef_search value and measures how many of the exact
+neighbours it finds and how long the queries take.
+
+Sample command (executed from skyegpt-backend folder):
+PYTHONPATH=. python -m evaluator.hnsw_benchmark --collection SkyeDoc-10.0 --ef-search 10 20 40 80 160
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+import argparse  # noqa: E402
+import json  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from typing import Any, Dict, List  # noqa: E402
+import numpy as np  # noqa: E402
+from chromadb import Collection, GetResult  # noqa: E402
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction  # noqa: E402
+from database.chroma_specific import chroma_client  # noqa: E402
+from evaluator import evaluator_utils  # noqa: E402
+
+DATA_DIRECTORY: str = "evaluator/test_data"
+QUESTION_BANK_FILE: str = "QuestionBank.csv"
+DEFAULT_EF_SEARCH_VALUES: tuple[int, ...] = (10, 20, 40, 80, 160, 320)
+DEFAULT_K: int = 10
+COPY_BATCH_SIZE: int = 1000
+BENCHMARK_COLLECTION_SUFFIX: str = "-ef-benchmark"
+
+
+def benchmark_ef_search(
+    collection: Collection, query_embeddings: np.ndarray, k: int, ef_search_values: List[int]
+) -> List[Dict[str, Any]]:
+    """Measure recall@k against exact search and the query latency of the collection for every ef_search value.
+
+    A changed ef_search only takes effect once the index is loaded again, so every value is measured on a
+    temporary copy of the collection built with the same space, max_neighbors and ef_construction.
+
+    Args:
+        collection: collection to benchmark, it is not modified
+        query_embeddings: embeddings of the benchmark queries, one row per query
+        k: number of neighbours to retrieve per query
+        ef_search_values: ef_search values to sweep
+
+    Returns:
+        List[Dict[str, Any]]: recall and latency percentiles per ef_search value.
+    """
+    corpus = collection.get(include=["embeddings"])
+    hnsw_configuration = chroma_client.get_hnsw_configuration(collection)
+    exact_neighbour_ids = _exact_nearest_neighbour_ids(
+        corpus, query_embeddings, k, chroma_client.get_distance_space(collection)
+    )
+
+    sweep_results = []
+    for ef_search in ef_search_values:
+        copy_name = f"{collection.name}{BENCHMARK_COLLECTION_SUFFIX}"
+        copy = chroma_client.create_collection(
+            copy_name,
+            {
+                "space": chroma_client.get_distance_space(collection),
+                "max_neighbors": hnsw_configuration.get("max_neighbors"),
+                "ef_construction": hnsw_configuration.get("ef_construction"),
+                "ef_search": ef_search,
+            },
+        )
+        try:
+            for batch_start in range(0, len(corpus["ids"]), COPY_BATCH_SIZE):
+                batch_end = batch_start + COPY_BATCH_SIZE
+                copy.add(
+                    ids=corpus["ids"][batch_start:batch_end], embeddings=corpus["embeddings"][batch_start:batch_end]
+                )
+
+            recalls, latencies_ms = [], []
+            for query_embedding, exact_ids in zip(query_embeddings, exact_neighbour_ids):
+                start_time = time.perf_counter()
+                result = copy.query(query_embeddings=[query_embedding.tolist()], n_results=k, include=[])
+                latencies_ms.append((time.perf_counter() - start_time) * 1000)
+                recalls.append(len(set(result["ids"][0]) & exact_ids) / len(exact_ids))
+        finally:
+            chroma_client.delete_collection(copy_name)
+
+        latencies_ms.sort()
+        sweep_results.append(
+            {
+                "ef_search": ef_search,
+                "k": k,
+                "recall": round(statistics.mean(recalls), 4),
+                "p50_ms": round(latencies_ms[len(latencies_ms) // 2], 3),
+                "p95_ms": round(latencies_ms[max(0, int(len(latencies_ms) * 0.95) - 1)], 3),
+            }
+        )
+    return sweep_results
+
+
+def _exact_nearest_neighbour_ids(corpus: GetResult, query_embeddings: np.ndarray, k: int, space: str) -> List[set[str]]:
+    corpus_ids = np.array(corpus["ids"])
+    corpus_embeddings = np.asarray(corpus["embeddings"], dtype=np.float32)
+    query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+
+    if space == "cosine":
+        corpus_embeddings = corpus_embeddings / np.linalg.norm(corpus_embeddings, axis=1, keepdims=True)
+        query_embeddings = query_embeddings / np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+    if space in ("cosine", "ip"):
+        distances = -(query_embeddings @ corpus_embeddings.T)
+    else:
+        distances = (
+            np.sum(query_embeddings**2, axis=1, keepdims=True)
+            - 2 * query_embeddings @ corpus_embeddings.T
+            + np.sum(corpus_embeddings**2, axis=1)
+        )
+
+    k = min(k, len(corpus_ids))
+    nearest_indexes = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    return [set(corpus_ids[indexes]) for indexes in nearest_indexes]
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep HNSW ef_search against recall and query latency.")
+    parser.add_argument("--collection", required=True, help="Name of the collection to benchmark")
+    parser.add_argument("--question-bank", default=QUESTION_BANK_FILE, help="CSV file in evaluator/test_data")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="Number of neighbours retrieved per query")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=list(DEFAULT_EF_SEARCH_VALUES))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = _parse_arguments()
+    test_cases = evaluator_utils.create_dict_from_csv(DATA_DIRECTORY, arguments.question_bank)
+    embeddings = np.asarray(DefaultEmbeddingFunction()([test_case["question"] for test_case in test_cases]))
+    benchmarked_collection = chroma_client.get_collection_by_name(arguments.collection)
+    print(f"Index configuration: {chroma_client.get_hnsw_configuration(benchmarked_collection)}")
+    for sweep_result in benchmark_ef_search(benchmarked_collection, embeddings, arguments.k, arguments.ef_search):
+        print(json.dumps(sweep_result))
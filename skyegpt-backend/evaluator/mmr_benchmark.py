@@ -0,0 +1,62 @@
+"""Micro-benchmark of the maximal marginal relevance re-ranking overhead per query.
+
+Runs the re-ranking on synthetic, unit-length embeddings of the size produced by the default
+Chroma embedding function, so it can run without a vector database.
+
+Usage:
+    python -m evaluator.mmr_benchmark
+"""
+
+import time
+import statistics
+import numpy as np
+from common import constants
+from database import vectordb_client
+
+EMBEDDING_DIMENSION: int = 384
+NUMBER_OF_QUERIES: int = 200
+K_VALUES: tuple[int, ...] = (10, 50)
+
+
+def benchmark_mmr(k: int, fetch_k_multiplier: int, mmr_lambda: float, number_of_queries: int) -> dict:
+    """Measure the per-query latency of MMR re-ranking for a given k."""
+    fetch_k = k * fetch_k_multiplier
+    rng = np.random.default_rng(seed=42)
+    latencies_ms = []
+    for _ in range(number_of_queries):
+        embeddings = _random_unit_vectors(rng, fetch_k)
+        distances = np.sort(rng.uniform(0.2, 1.2, fetch_k)).astype(np.float32)
+        query_result = {
+            "ids": [[str(index) for index in range(fetch_k)]],
+            "documents": [[f"document {index}" for index in range(fetch_k)]],
+            "metadatas": [[{"file_name": str(index)} for index in range(fetch_k)]],
+            "distances": [distances],
+            "embeddings": [embeddings],
+        }
+
+        start_time = time.perf_counter()
+        vectordb_client.rerank_with_mmr(query_result, k, mmr_lambda, "l2")
+        latencies_ms.append((time.perf_counter() - start_time) * 1000)
+
+    latencies_ms.sort()
+    return {
+        "k": k,
+        "fetch_k": fetch_k,
+        "mean_ms": round(statistics.mean(latencies_ms), 3),
+        "p50_ms": round(latencies_ms[len(latencies_ms) // 2], 3),
+        "p95_ms": round(latencies_ms[int(len(latencies_ms) * 0.95) - 1], 3),
+    }
+
+
+def _random_unit_vectors(rng: np.random.Generator, number_of_vectors: int) -> np.ndarray:
+    vectors = rng.standard_normal((number_of_vectors, EMBEDDING_DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+if __name__ == "__main__":
+    for k_value in K_VALUES:
+        print(
+            benchmark_mmr(
+                k_value, constants.VECTOR_MMR_FETCH_K_MULTIPLIER, constants.VECTOR_MMR_LAMBDA, NUMBER_OF_QUERIES
+            )
+        )
@@ -0,0 +1,211 @@
+"""Retrieval-only benchmark over the question bank: recall@k, MRR and query latency.
+
+Queries the vector database directly with every question of the question bank and checks whether the
+reference context was retrieved. No LLM is involved, so it is fast and free and can be used to compare
+chunking or index changes. Results are saved as JSON and can be compared with a previous run.
+
+Sample command (executed from skyegpt-backend folder):
+PYTHONPATH=. python -m evaluator.retrieval_benchmark --skye-version 10.0
+PYTHONPATH=. python -m evaluator.retrieval_benchmark --compare evaluator/retrieval_benchmark_results/<previous>.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from dotenv import load_dotenv
+from evaluator import evaluator_utils
+
+DATA_DIRECTORY: str = "evaluator/test_data"
+QUESTION_BANK_FILE: str = "QuestionBank.csv"
+REFERENCE_CONTEXT_SEPARATOR: str = "§§"
+RECALL_AT_K: tuple[int, ...] = (1, 3, 5, 10)
+SHINGLE_SIZE: int = 3
+MATCH_THRESHOLD: float = 0.5
+
+
+def run_benchmark(
+    search: Callable[[str], Dict[str, Any]], test_cases: List[Dict[str, str]], configuration: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Run every question through search and score the retrieved documents against the reference context.
+
+    Args:
+        search: function returning the structured search result ({"documents": [{"document": ...}]}) of a query
+        test_cases: rows of the question bank with question and reference_context
+        configuration: description of the searched setup, stored with the results for later comparison
+
+    Returns:
+        Dict[str, Any]: the configuration, the aggregated metrics and the per-question results.
+    """
+    question_results = []
+    for test_case in test_cases:
+        references = [
+            reference.strip()
+            for reference in test_case["reference_context"].split(REFERENCE_CONTEXT_SEPARATOR)
+            if reference.strip()
+        ]
+        start_time = time.perf_counter()
+        search_result = search(test_case["question"])
+        latency_ms = (time.perf_counter() - start_time) * 1000
+
+        retrieved_documents = [pair["document"] for pair in search_result.get("documents", [])]
+        question_results.append(score_question(test_case["question"], references, retrieved_documents, latency_ms))
+
+    return {
+        "configuration": configuration,
+        "metrics": aggregate_metrics(question_results),
+        "questions": question_results,
+    }
+
+
+def score_question(
+    question: str, references: List[str], retrieved_documents: List[str], latency_ms: float
+) -> Dict[str, Any]:
+    """Find the rank at which every reference fragment was retrieved (None if it was not)."""
+    retrieved_shingles = [_shingles(document) for document in retrieved_documents]
+    reference_ranks = []
+    for reference in references:
+        reference_shingles = _shingles(reference)
+        reference_ranks.append(
+            next(
+                (
+                    rank
+                    for rank, document_shingles in enumerate(retrieved_shingles, start=1)
+                    if _overlap_coefficient(reference_shingles, document_shingles) >= MATCH_THRESHOLD
+                ),
+                None,
+            )
+        )
+    found_ranks = [rank for rank in reference_ranks if rank is not None]
+    return {
+        "question": question,
+        "reference_ranks": reference_ranks,
+        "first_relevant_rank": min(found_ranks) if found_ranks else None,
+        "number_of_retrieved_documents": len(retrieved_documents),
+        "latency_ms": round(latency_ms, 2),
+    }
+
+
+def aggregate_metrics(question_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calculate recall@k, MRR and latency percentiles over all scored questions."""
+    if not question_results:
+        return {}
+
+    recall_at_k = {}
+    for k in RECALL_AT_K:
+        recalls = [
+            sum(1 for rank in result["reference_ranks"] if rank is not None and rank <= k)
+            / len(result["reference_ranks"])
+            for result in question_results
+            if result["reference_ranks"]
+        ]
+        recall_at_k[f"recall@{k}"] = round(statistics.mean(recalls), 4) if recalls else 0.0
+
+    reciprocal_ranks = [
+        1 / result["first_relevant_rank"] if result["first_relevant_rank"] else 0.0 for result in question_results
+    ]
+    latencies_ms = sorted(result["latency_ms"] for result in question_results)
+    return {
+        "number_of_questions": len(question_results),
+        **recall_at_k,
+        "mrr": round(statistics.mean(reciprocal_ranks), 4),
+        "latency_p50_ms": round(_percentile(latencies_ms, 50), 2),
+        "latency_p95_ms": round(_percentile(latencies_ms, 95), 2),
+    }
+
+
+def compare_metrics(current: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Return the previous value, current value and difference of every shared numeric metric."""
+    comparison = {}
+    for metric_name, current_value in current.items():
+        previous_value = previous.get(metric_name)
+        if isinstance(current_value, (int, float)) and isinstance(previous_value, (int, float)):
+            comparison[metric_name] = {
+                "previous": previous_value,
+                "current": current_value,
+                "difference": round(current_value - previous_value, 4),
+            }
+    return comparison
+
+
+def save_results(results: Dict[str, Any], results_folder: str) -> str:
+    """Save the benchmark results to a timestamped JSON file and return its path."""
+    os.makedirs(results_folder, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
+    file_path = os.path.join(results_folder, f"retrieval_benchmark_{timestamp}.json")
+    with open(file_path, "w") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(f"Results saved to {file_path}")
+    return file_path
+
+
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)} if words else set()
+    return {tuple(words[index : index + SHINGLE_SIZE]) for index in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _overlap_coefficient(first: set, second: set) -> float:
+    """Share of the smaller set found in the larger one, so a chunk inside the reference counts as a match."""
+    if not first or not second:
+        return 0.0
+    return len(first & second) / min(len(first), len(second))
+
+
+def _percentile(sorted_values: List[float], percentile: int) -> float:
+    index = max(0, min(len(sorted_values) - 1, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Retrieval-only benchmark over the question bank.")
+    parser.add_argument("--question-bank", default=QUESTION_BANK_FILE, help="CSV file in evaluator/test_data")
+    parser.add_argument("--skye-version", default=None, help="Skye major version to search, e.g. 10.0")
+    parser.add_argument("--source", choices=["skye", "iph"], default=None, help="Limit the search to one source")
+    parser.add_argument("--no-mmr", action="store_true", help="Disable maximal marginal relevance re-ranking")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to compare the metrics with")
+    return parser.parse_args()
+
+
+def _main(arguments: argparse.Namespace) -> None:
+    load_dotenv()
+    from common import constants
+    from database import vectordb_client
+
+    use_mmr = constants.VECTOR_MMR_ENABLED and not arguments.no_mmr
+    collection_names = vectordb_client.resolve_collection_names(arguments.skye_version, arguments.source)
+    configuration = {
+        "question_bank": arguments.question_bank,
+        "collection_names": collection_names,
+        "number_of_results": constants.VECTOR_NUMBER_OF_RESULTS,
+        "use_mmr": use_mmr,
+        "mmr_lambda": constants.VECTOR_MMR_LAMBDA,
+    }
+
+    def search(question: str) -> Dict[str, Any]:
+        return vectordb_client.find_related_documents_to_query(
+            question, arguments.skye_version, arguments.source, use_mmr=use_mmr
+        )
+
+    test_cases = evaluator_utils.create_dict_from_csv(DATA_DIRECTORY, arguments.question_bank)
+    results = run_benchmark(search, test_cases, configuration)
+    if arguments.compare:
+        previous_results = _load_results(arguments.compare)
+        results["comparison"] = compare_metrics(results["metrics"], previous_results.get("metrics", {}))
+
+    print(json.dumps({key: results[key] for key in ("metrics", "comparison") if key in results}, indent=2))
+    save_results(results, os.getenv("RETRIEVAL_BENCHMARK_RESULTS_FOLDER", "./evaluator/retrieval_benchmark_results"))
+
+
+def _load_results(file_path: str) -> Dict[str, Any]:
+    with open(file_path, "r") as results_file:
+        return json.load(results_file)
+
+
+if __name__ == "__main__":
+    _main(_parse_arguments())
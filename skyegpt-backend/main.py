@@ -8,13 +8,24 @@ from apis import asker_apis_router  # noqa: E402
 from apis import setup_apis_router  # noqa: E402
 from apis import evaluator_apis_router  # noqa: E402
 from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from database import vectordb_client  # noqa: E402
+from contextlib import asynccontextmanager  # noqa: E402
 import signal  # noqa: E402
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Runs the background tasks of the application while it is serving."""
+    vectordb_client.start_health_probe()
+    yield
+    vectordb_client.stop_health_probe()
+
+
 app = FastAPI(
     title="SkyeGPT API",
     description="SkyeGPT's backend APIs which allows to scrape information and upload to database and then query it",
     version="0.1.0",
+    lifespan=lifespan,
 )
 app.include_router(asker_apis_router)
 app.include_router(setup_apis_router)
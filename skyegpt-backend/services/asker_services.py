@@ -28,12 +28,15 @@ class AgentResponseStreamingService:
     specifically Server-Sent Events (SSE).
     """
 
-    async def stream_agent_response(self, user_question: str, conversation_id: uuid) -> AsyncGenerator[str, None]:
+    async def stream_agent_response(
+        self, user_question: str, conversation_id: uuid, skye_version: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
         """Streams AI responses as SSE events.
 
         Args:
             user_question (str): The user's question.
             conversation_id (uuid.UUID): Unique conversation ID.
+            skye_version (Optional[str]): Skye major version the user works with, if known.
 
         Yields:
             str: SSE-formatted response chunks.
@@ -44,7 +47,9 @@ class AgentResponseStreamingService:
         """
         queue = asyncio.Queue()
         _loading_text_task = asyncio.create_task(self._produce_loading_texts(user_question, queue))
-        _response_task = asyncio.create_task(self._produce_response(user_question, conversation_id, queue))
+        _response_task = asyncio.create_task(
+            self._produce_response(user_question, conversation_id, skye_version, queue)
+        )
 
         done_streams = 0
         while done_streams < 2:
@@ -75,17 +80,22 @@ class AgentResponseStreamingService:
 
     @staticmethod
     @handle_asyncio_producer_task_errors(-1, False)
-    async def _produce_response(user_question: str, conversation_id: uuid, queue: asyncio.Queue):
+    async def _produce_response(
+        user_question: str, conversation_id: uuid, skye_version: Optional[str], queue: asyncio.Queue
+    ):
         """Produces streamed AI response chunks and puts them into the queue as SSE events.
 
         Args:
             user_question (str): The user's question.
             conversation_id (uuid.UUID): Unique conversation ID.
+            skye_version (Optional[str]): Skye major version the user works with, if known.
             queue (asyncio.Queue): Queue to put SSE-formatted response chunks.
         """
         logger.info("Asker service stream_agent_response started")
         agent_service_model = AgentService(store_manager, prompts.responder_openai_v4_openai_template)
-        agent_response_stream = await agent_service_model.stream_agent_response(user_question, conversation_id)
+        agent_response_stream = await agent_service_model.stream_agent_response(
+            user_question, conversation_id, skye_version
+        )
         async for chunk in agent_response_stream:
             sse_formatted_text = utils.format_str_to_sse(chunk, SseEventTypes.streamed_response)
             await queue.put(sse_formatted_text)
@@ -99,7 +109,7 @@ class AggregatedAgentResponseService:
     """
 
     async def aggregated_agent_response(
-        self, question: str, conversation_id: uuid, with_context: bool
+        self, question: str, conversation_id: uuid, with_context: bool, skye_version: Optional[str] = None
     ) -> dict[str, Any]:
         """Generate a full answer (and optional context) for a question.
 
@@ -107,6 +117,7 @@ class AggregatedAgentResponseService:
             question (str): The user's question.
             conversation_id (uuid.UUID): ID for context lookup.
             with_context (bool): If True, include prior context (like tool run metadata).
+            skye_version (Optional[str]): Skye major version the user works with, if known.
 
         Returns:
             dict[str, Any]: {
@@ -118,7 +129,7 @@ class AggregatedAgentResponseService:
             UsageLimitExceededError: When usage limits are reached.
             ResponseGenerationError: On generation errors.
         """
-        response = await self._aggregate_agent_response(question, conversation_id)
+        response = await self._aggregate_agent_response(question, conversation_id, skye_version)
 
         if with_context:
             nested_context: Optional[Any] = await self._get_conversation_context(conversation_id)
@@ -127,19 +138,22 @@ class AggregatedAgentResponseService:
         return response
 
     # noinspection PyMethodMayBeStatic
-    async def _aggregate_agent_response(self, question: str, conversation_id: uuid) -> dict[str, Any]:
+    async def _aggregate_agent_response(
+        self, question: str, conversation_id: uuid, skye_version: Optional[str] = None
+    ) -> dict[str, Any]:
         """Helper method to convert the streamed agent response to an aggregated string.
 
         Args:
             question (str): The user's question.
             conversation_id (uuid.UUID): Unique conversation ID.
+            skye_version (Optional[str]): Skye major version the user works with, if known.
 
         Returns:
             dict[str, Any]: Aggregated response dictionary.
         """
         agent_service_model = AgentService(store_manager, prompts.responder_openai_v4_openai_template)
         parts: list[str] = []
-        async for chunk in await agent_service_model.stream_agent_response(question, conversation_id):
+        async for chunk in await agent_service_model.stream_agent_response(question, conversation_id, skye_version):
             parts.append(chunk)
         full_response = "".join(parts)
         return {"generated_answer": full_response}
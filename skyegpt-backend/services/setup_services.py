@@ -6,6 +6,7 @@ from common import logger, utils, constants
 from database import vectordb_client
 from common.exceptions import VectorDBError, CollectionNotFoundError
 from data_ingestion.persister import markdown_2_vector_db
+from typing import Optional
 
 
 class IngestionService:
@@ -57,17 +58,33 @@ class IngestionService:
             raise e
 
     # noinspection PyMethodMayBeStatic
-    def import_skyedoc(self, skye_major_version: str, markdown_headers: list) -> None:
+    def import_skyedoc(
+        self,
+        skye_major_version: str,
+        markdown_headers: list,
+        parent_document_retrieval: bool = False,
+        index_configuration: Optional[dict] = None,
+    ) -> None:
         """Orchestrates importing Skyedoc from local storage into the vector database.
 
+        Every Skye major version is imported into its own collection, so searches can be scoped to a version.
+        With parent_document_retrieval, small child chunks are embedded and point to their stored header section.
+        index_configuration holds the HNSW index parameters used when the collection is created.
+
         Raises:
             Exception: For unexpected import errors.
         """
         logger.info(f"IngestionService: Attempting to import SkyeDoc version {skye_major_version}")
         try:
             skyedoc_folder_path = utils.generate_local_folder_path_from_skye_version(skye_major_version)
+            collection_name = utils.generate_skye_doc_collection_name(skye_major_version)
             markdown_2_vector_db.scan_and_import_markdowns_from_folder(
-                constants.SKYE_DOC_COLLECTION_NAME, skyedoc_folder_path, markdown_headers
+                collection_name,
+                skyedoc_folder_path,
+                markdown_headers,
+                {"skye_version": skye_major_version},
+                parent_document_retrieval=parent_document_retrieval,
+                index_configuration=index_configuration,
             )
             logger.info(f"Skyedoc for version {skye_major_version} successfully imported")
         except Exception as e:
@@ -75,16 +92,28 @@ class IngestionService:
             raise e
 
     # noinspection PyMethodMayBeStatic
-    def import_iph(self, markdown_headers: list) -> None:
+    def import_iph(
+        self,
+        markdown_headers: list,
+        parent_document_retrieval: bool = False,
+        index_configuration: Optional[dict] = None,
+    ) -> None:
         """Orchestrates importing Innoveo Partner Hub into the vector database.
 
+        With parent_document_retrieval, small child chunks are embedded and point to their stored header section.
+        index_configuration holds the HNSW index parameters used when the collection is created.
+
         Raises:
             Exception: For unexpected import errors.
         """
         logger.info("IngestionService: Attempting to import IPH to lookup database")
         try:
             markdown_2_vector_db.scan_and_import_markdowns_from_folder(
-                constants.IPH_DOC_COLLECTION_NAME, constants.IPH_LOCAL_FOLDER_LOCATION, markdown_headers
+                constants.IPH_DOC_COLLECTION_NAME,
+                constants.IPH_LOCAL_FOLDER_LOCATION,
+                markdown_headers,
+                parent_document_retrieval=parent_document_retrieval,
+                index_configuration=index_configuration,
             )
             logger.info("IPH successfully imported")
         except Exception as e:
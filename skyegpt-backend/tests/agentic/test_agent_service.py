@@ -75,3 +75,17 @@ async def test_stream_agent_response_full_logic_happy_path(
     store = agent_service_instance.store_manager
     store.get_conversation_by_id.assert_called_once_with(test_conversation_id)
     store.extend_conversation_history.assert_called_once_with(test_conversation_id, ANY)
+
+
+def test_construct_user_prompt_appends_skye_version(setup_test_environment):
+    # setup static data
+    prompt_definition = sample_objects.sample_agent_service_prompt.model_copy(
+        update={"prompt_template": "Q: {{user_question}}", "skye_version_template": " Version: {{skye_version}}"}
+    )
+    agent_service = AgentService(AsyncMock(), prompt_definition)
+    # act
+    with_version = agent_service._construct_user_prompt("Is SOAP supported?", "10.0")
+    without_version = agent_service._construct_user_prompt("Is SOAP supported?")
+    # assert result
+    assert with_version == "Q: Is SOAP supported? Version: 10.0"
+    assert without_version == "Q: Is SOAP supported?"
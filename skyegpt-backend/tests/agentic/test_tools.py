@@ -0,0 +1,16 @@
+from unittest.mock import patch
+from agentic import tools
+from common import message_bundle
+from common.exceptions import VectorDBUnavailableError
+
+
+@patch("database.vectordb_client.find_related_documents_to_query")
+def test_search_in_skye_documentation_returns_degraded_message_when_database_unavailable(mock_find_related):
+    # setup mocks
+    mock_find_related.side_effect = VectorDBUnavailableError("Vector database circuit is open")
+
+    # act
+    result = tools.search_in_skye_documentation("Does Skye support SOAP API?")
+
+    # assert result
+    assert result == {"documents": [], "error": message_bundle.DOCUMENTATION_SEARCH_UNAVAILABLE}
@@ -24,7 +24,7 @@ async def test_generate_agent_response_with_context_happy_path():
     )
 
     mock_agent_response_service.aggregated_agent_response.assert_called_once_with(
-        test_query, test_conversation_id, True
+        test_query, test_conversation_id, True, None
     )
     assert isinstance(response, AgentResponse), "Response should be an instance of AgentResponse"
     assert response.generated_answer == expected_generated_answer
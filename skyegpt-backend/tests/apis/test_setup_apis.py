@@ -1,10 +1,10 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call
 import pytest
 from apis.schemas.requests import SkyeVersionRequest, ImportRequest
 from apis.schemas.responses import DownloadResponse, ImportResponse
 from apis.setup_apis import download_skye_documentation, download_iph, delete_collection, import_to_database
 from fastapi import HTTPException
-from common import message_bundle, constants
+from common import message_bundle, constants, utils
 from common.exceptions import CollectionNotFoundError
 
 
@@ -104,6 +104,8 @@ async def test_import_to_database_skyedoc_only_happy_path():
     test_request = MagicMock(spec=ImportRequest)
     test_request.markdown_split_headers = test_markdown_split_headers
     test_request.imports = mock_imports_config
+    test_request.parent_document_retrieval = True
+    test_request.index = ImportRequest.IndexConfig(space="cosine", ef_search=100)
 
     mock_ingestion_service = MagicMock()
     mock_ingestion_service.import_skyedoc = MagicMock()
@@ -116,9 +118,13 @@ async def test_import_to_database_skyedoc_only_happy_path():
         request=test_request, ingestion_service=mock_ingestion_service, database_service=mock_database_service
     )
 
-    mock_ingestion_service.import_skyedoc.assert_called_once_with(test_skye_version, test_markdown_split_headers)
+    mock_ingestion_service.import_skyedoc.assert_called_once_with(
+        test_skye_version, test_markdown_split_headers, True, {"space": "cosine", "ef_search": 100}
+    )
     mock_ingestion_service.import_iph.assert_not_called()
-    mock_database_service.number_of_documents_in_collection.assert_called_once_with(constants.SKYE_DOC_COLLECTION_NAME)
+    mock_database_service.number_of_documents_in_collection.assert_called_once_with(
+        utils.generate_skye_doc_collection_name(test_skye_version)
+    )
     assert isinstance(response, ImportResponse)
     assert response.number_of_documents == expected_doc_count
 
@@ -142,6 +148,8 @@ async def test_import_to_database_iph_only_happy_path():
     test_request = MagicMock(spec=ImportRequest)
     test_request.markdown_split_headers = test_markdown_split_headers
     test_request.imports = mock_imports_config
+    test_request.parent_document_retrieval = True
+    test_request.index = None
 
     mock_ingestion_service = MagicMock()
     mock_ingestion_service.import_skyedoc = MagicMock()
@@ -155,8 +163,8 @@ async def test_import_to_database_iph_only_happy_path():
     )
 
     mock_ingestion_service.import_skyedoc.assert_not_called()
-    mock_ingestion_service.import_iph.assert_called_once_with(test_markdown_split_headers)
-    mock_database_service.number_of_documents_in_collection.assert_called_once_with(constants.SKYE_DOC_COLLECTION_NAME)
+    mock_ingestion_service.import_iph.assert_called_once_with(test_markdown_split_headers, True, None)
+    mock_database_service.number_of_documents_in_collection.assert_called_once_with(constants.IPH_DOC_COLLECTION_NAME)
     assert isinstance(response, ImportResponse)
     assert response.number_of_documents == expected_doc_count
 
@@ -181,6 +189,8 @@ async def test_import_to_database_both_enabled_happy_path():
     test_request = MagicMock(spec=ImportRequest)
     test_request.markdown_split_headers = test_markdown_split_headers
     test_request.imports = mock_imports_config
+    test_request.parent_document_retrieval = True
+    test_request.index = None
 
     mock_ingestion_service = MagicMock()
     mock_ingestion_service.import_skyedoc = MagicMock()
@@ -193,11 +203,15 @@ async def test_import_to_database_both_enabled_happy_path():
         request=test_request, ingestion_service=mock_ingestion_service, database_service=mock_database_service
     )
 
-    mock_ingestion_service.import_skyedoc.assert_called_once_with(test_skye_version, test_markdown_split_headers)
-    mock_ingestion_service.import_iph.assert_called_once_with(test_markdown_split_headers)
-    mock_database_service.number_of_documents_in_collection.assert_called_once_with(constants.SKYE_DOC_COLLECTION_NAME)
+    mock_ingestion_service.import_skyedoc.assert_called_once_with(
+        test_skye_version, test_markdown_split_headers, True, None
+    )
+    mock_ingestion_service.import_iph.assert_called_once_with(test_markdown_split_headers, True, None)
+    mock_database_service.number_of_documents_in_collection.assert_has_calls(
+        [call(utils.generate_skye_doc_collection_name(test_skye_version)), call(constants.IPH_DOC_COLLECTION_NAME)]
+    )
     assert isinstance(response, ImportResponse)
-    assert response.number_of_documents == expected_doc_count
+    assert response.number_of_documents == 2 * expected_doc_count
 
 
 @pytest.mark.asyncio
@@ -218,6 +232,8 @@ async def test_import_to_database_no_import_selected_error():
     test_request = MagicMock(spec=ImportRequest)
     test_request.markdown_split_headers = test_markdown_split_headers
     test_request.imports = mock_imports_config
+    test_request.parent_document_retrieval = True
+    test_request.index = None
 
     mock_ingestion_service = MagicMock()
     mock_ingestion_service.import_skyedoc = MagicMock()
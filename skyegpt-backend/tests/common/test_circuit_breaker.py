@@ -0,0 +1,69 @@
+from unittest.mock import patch
+from common.circuit_breaker import CircuitBreaker, CircuitState
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    # setup static data
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=30)
+
+    # act
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    # assert result
+    assert breaker.state == CircuitState.open
+    assert not breaker.allow_request()
+
+
+def test_circuit_breaker_success_resets_failure_count():
+    # setup static data
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30)
+
+    # act
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    # assert result
+    assert breaker.state == CircuitState.closed
+
+
+@patch("common.circuit_breaker.time.monotonic")
+def test_circuit_breaker_allows_one_trial_call_after_reset_time(mock_monotonic):
+    # setup static data
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30)
+
+    # setup mocks
+    mock_monotonic.return_value = 100.0
+    breaker.record_failure()
+
+    # act
+    mock_monotonic.return_value = 131.0
+    first_call_allowed = breaker.allow_request()
+    second_call_allowed = breaker.allow_request()
+
+    # assert result
+    assert first_call_allowed
+    assert not second_call_allowed
+    assert breaker.state == CircuitState.half_open
+
+
+@patch("common.circuit_breaker.time.monotonic")
+def test_circuit_breaker_failed_trial_call_reopens(mock_monotonic):
+    # setup static data
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=30)
+
+    # setup mocks
+    mock_monotonic.return_value = 100.0
+    for _ in range(3):
+        breaker.record_failure()
+    mock_monotonic.return_value = 131.0
+    breaker.allow_request()
+
+    # act
+    breaker.record_failure()
+
+    # assert result
+    assert breaker.state == CircuitState.open
+    assert not breaker.allow_request()
@@ -85,6 +85,17 @@ def test_generate_local_folder_path_from_skye_version(monkeypatch):
     assert actual_path == expected_path
 
 
+def test_generate_skye_doc_collection_name(monkeypatch):
+    # setup static
+    template = "Docs-{{skye_major_version}}"
+    # setup mock
+    monkeypatch.setattr(utils.constants, "SKYE_DOC_COLLECTION_NAME_TEMPLATE", template, raising=False)
+    # act
+    actual_name = utils.generate_skye_doc_collection_name("9.16")
+    # assert result
+    assert actual_name == "Docs-9.16"
+
+
 @patch("common.utils.datetime")
 def test_calculate_utc_x_hours_ago(mock_datetime):
     # setup static
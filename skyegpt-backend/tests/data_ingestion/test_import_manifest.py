@@ -0,0 +1,53 @@
+from unittest.mock import patch
+from data_ingestion.persister import import_manifest
+
+
+def test_chunk_ids_are_deterministic_and_unique_for_repeated_texts():
+    # setup static data
+    texts = ["# Header\nsame text", "# Other\ntext", "# Header\nsame text"]
+
+    # act
+    first_ids = import_manifest.chunk_ids("fingerprint/file.md", texts)
+    second_ids = import_manifest.chunk_ids("fingerprint/file.md", texts)
+    other_file_ids = import_manifest.chunk_ids("fingerprint/other.md", texts)
+
+    # assert result
+    assert first_ids == second_ids
+    assert len(set(first_ids)) == 3
+    assert set(first_ids).isdisjoint(other_file_ids)
+
+
+def test_settings_fingerprint_changes_with_split_settings():
+    # act
+    fingerprint = import_manifest.settings_fingerprint(["#", "##"], False, {"skye_version": "10.0"})
+    same_fingerprint = import_manifest.settings_fingerprint(["##", "#"], False, {"skye_version": "10.0"})
+    parent_fingerprint = import_manifest.settings_fingerprint(["#", "##"], True, {"skye_version": "10.0"})
+
+    # assert result
+    assert fingerprint == same_fingerprint
+    assert fingerprint != parent_fingerprint
+
+
+def test_is_manifest_usable_requires_same_settings_and_document_count():
+    # setup static data
+    manifest = {"settings_fingerprint": "abc", "files": {"a.md": {"chunk_ids": ["1", "2"], "parent_ids": []}}}
+
+    # act & assert result
+    assert import_manifest.is_manifest_usable(manifest, "abc", 2)
+    assert not import_manifest.is_manifest_usable(manifest, "other", 2)
+    assert not import_manifest.is_manifest_usable(manifest, "abc", 0)
+    assert not import_manifest.is_manifest_usable(None, "abc", 0)
+
+
+def test_save_and_load_manifest(tmp_path):
+    # setup static data
+    files = {"a.md": {"content_hash": "123", "chunk_ids": ["1"], "parent_ids": []}}
+
+    # act
+    with patch("common.constants.IMPORT_MANIFEST_FOLDER_LOCATION", str(tmp_path)):
+        import_manifest.save_manifest("SkyeDoc-10.0", "abc", files)
+        manifest = import_manifest.load_manifest("SkyeDoc-10.0")
+
+    # assert result
+    assert manifest["settings_fingerprint"] == "abc"
+    assert manifest["files"] == files
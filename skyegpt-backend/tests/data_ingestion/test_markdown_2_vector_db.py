@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+from queue import Queue
+from multiprocessing import Value
+from unittest.mock import patch
+from data_ingestion.persister import markdown_2_vector_db
+
+markdown_file_content = """# Header 1
+text under header 1
+# Header 2
+text under header 2"""
+
+
+def _run_import_file(folder, changed_file):
+    queue = Queue()
+    parser_settings = {
+        "folder_path": str(folder),
+        "markdown_split_headers": ["#"],
+        "batch_size": 10,
+        "base_metadata": {},
+        "parent_document_retrieval": False,
+        "settings_fingerprint": "fingerprint",
+    }
+    markdown_2_vector_db._init_parser_process(parser_settings, queue, Value("i", 0))
+    _, entry = markdown_2_vector_db._import_file(changed_file)
+    batches = []
+    while not queue.empty():
+        batches.append(queue.get())
+    return batches, entry
+
+
+def test_import_file_only_queues_changed_chunks_and_deletes_stale_ones(tmp_path):
+    # setup static data
+    (tmp_path / "skyedoc").mkdir()
+    markdown_file = tmp_path / "skyedoc" / "123.md"
+    markdown_file.write_text(markdown_file_content)
+    _, first_entry = _run_import_file(tmp_path, ("skyedoc/123.md", "hash-1", None))
+
+    # act
+    markdown_file.write_text(markdown_file_content.replace("text under header 2", "changed text"))
+    batches, second_entry = _run_import_file(tmp_path, ("skyedoc/123.md", "hash-2", first_entry))
+
+    # assert result
+    assert second_entry["content_hash"] == "hash-2"
+    assert second_entry["chunk_ids"][0] == first_entry["chunk_ids"][0]
+    assert batches[0]["ids"] == [second_entry["chunk_ids"][1]]
+    assert batches[0]["documents"] == ["# Header 2\nchanged text"]
+    assert batches[1] == {"delete": {"ids": [first_entry["chunk_ids"][1]], "parent_ids": []}, "sequence_number": 2}
+
+
+def test_import_progress_reports_batches_in_order(capsys):
+    # setup static data
+    progress_queue = Queue()
+    progress = markdown_2_vector_db._ImportProgress()
+
+    # act
+    progress_queue.put((2, 10))
+    progress_queue.put((3, 5))
+    progress.receive(progress_queue, timeout=0)
+    output_before_first_batch = capsys.readouterr().out
+    progress_queue.put((1, 7))
+    progress.receive(progress_queue, timeout=0)
+    output_after_first_batch = capsys.readouterr().out
+
+    # assert result
+    assert output_before_first_batch == ""
+    assert output_after_first_batch.splitlines() == [
+        "Saved batch: 1 with 7 documents",
+        "Saved batch: 2 with 10 documents",
+        "Saved batch: 3 with 5 documents",
+    ]
+    assert progress.documents_written == 22
+
+
+_init_parser_process = markdown_2_vector_db._init_parser_process
+_parser_process_ids = multiprocessing.Queue()
+
+
+def _init_and_record_parser_process(*args):
+    _parser_process_ids.put(os.getpid())
+    _init_parser_process(*args)
+
+
+def _is_running(process_id):
+    try:
+        os.kill(process_id, 0)
+        return True
+    except ProcessLookupError:
+        return False
+
+
+@patch("data_ingestion.persister.markdown_2_vector_db._init_parser_process", _init_and_record_parser_process)
+def test_terminating_the_producer_stops_its_parser_processes(tmp_path):
+    # setup static data
+    (tmp_path / "skyedoc").mkdir()
+    for file_number in range(20):
+        (tmp_path / "skyedoc" / f"{file_number}.md").write_text(markdown_file_content)
+    changed_files = [(f"skyedoc/{file_number}.md", "hash", None) for file_number in range(20)]
+    full_queue = multiprocessing.Queue(maxsize=1)
+    producer_process = multiprocessing.Process(
+        target=markdown_2_vector_db._chroma_import_producer,
+        args=(str(tmp_path), changed_files, ["#"], 1, full_queue, multiprocessing.Queue(), {}, False, "print", 2),
+    )
+    producer_process.start()
+    parser_process_ids = [_parser_process_ids.get(timeout=30) for _ in range(2)]
+
+    # act
+    producer_process.terminate()
+    producer_process.join(timeout=30)
+
+    # assert result
+    assert producer_process.exitcode == 1
+    assert not any(_is_running(process_id) for process_id in parser_process_ids)
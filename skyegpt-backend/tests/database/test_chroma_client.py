@@ -0,0 +1,83 @@
+from unittest.mock import patch, MagicMock
+import httpx
+import pytest
+from common.circuit_breaker import CircuitBreaker, CircuitState
+from common.exceptions import VectorDBUnavailableError
+from database.chroma_specific import chroma_client
+
+
+@patch("database.chroma_specific.chroma_client._chroma_client")
+def test_create_collection_if_needed_passes_hnsw_configuration(mock_client):
+    # setup static data
+    test_hnsw_configuration = {"space": "cosine", "max_neighbors": 32, "ef_construction": 200, "ef_search": 100}
+
+    # setup mocks
+    mock_collection = MagicMock()
+    mock_collection.configuration_json = {"hnsw": dict(test_hnsw_configuration)}
+    mock_client.get_or_create_collection.return_value = mock_collection
+
+    # act
+    chroma_client.create_collection_if_needed("SkyeDoc-10.0", test_hnsw_configuration)
+
+    # assert result
+    _, kwargs = mock_client.get_or_create_collection.call_args
+    assert kwargs["configuration"] == {"hnsw": test_hnsw_configuration}
+    mock_collection.modify.assert_not_called()
+
+
+@patch("database.chroma_specific.chroma_client._chroma_client")
+def test_create_collection_if_needed_updates_ef_search_of_existing_collection(mock_client):
+    # setup mocks
+    mock_collection = MagicMock()
+    mock_collection.configuration_json = {"hnsw": {"space": "l2", "ef_search": 100}}
+    mock_client.get_or_create_collection.return_value = mock_collection
+
+    # act
+    chroma_client.create_collection_if_needed("SkyeDoc-10.0", {"ef_search": 40})
+
+    # assert result
+    mock_collection.modify.assert_called_once_with(configuration={"hnsw": {"ef_search": 40}})
+
+
+@patch("database.chroma_specific.chroma_client._chroma_client")
+def test_create_collection_if_needed_without_configuration_uses_defaults(mock_client):
+    # act
+    chroma_client.create_collection_if_needed("SkyeDoc-10.0")
+
+    # assert result
+    _, kwargs = mock_client.get_or_create_collection.call_args
+    assert kwargs["configuration"] is None
+    mock_client.get_or_create_collection.return_value.modify.assert_not_called()
+
+
+@patch("database.chroma_specific.chroma_client._circuit_breaker", new_callable=lambda: CircuitBreaker("test", 2, 30))
+@patch("database.chroma_specific.chroma_client._chroma_client")
+def test_unreachable_database_opens_circuit_and_fails_fast(mock_client, mock_breaker):
+    # setup mocks
+    mock_client.list_collections.side_effect = httpx.ConnectError("Connection refused")
+
+    # act
+    for _ in range(2):
+        with pytest.raises(VectorDBUnavailableError):
+            chroma_client.list_collection_names()
+    with pytest.raises(VectorDBUnavailableError):
+        chroma_client.list_collection_names()
+
+    # assert result
+    assert mock_breaker.state == CircuitState.open
+    assert mock_client.list_collections.call_count == 2
+
+
+@patch("database.chroma_specific.chroma_client._circuit_breaker", new_callable=lambda: CircuitBreaker("test", 1, 30))
+@patch("database.chroma_specific.chroma_client._chroma_client")
+def test_successful_health_probe_closes_circuit(mock_client, mock_breaker):
+    # setup mocks
+    mock_breaker.record_failure()
+
+    # act
+    is_healthy = chroma_client.probe_health()
+
+    # assert result
+    assert is_healthy
+    mock_client.heartbeat.assert_called_once()
+    assert mock_breaker.state == CircuitState.closed
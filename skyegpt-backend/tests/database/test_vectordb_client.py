@@ -0,0 +1,209 @@
+from unittest.mock import patch, MagicMock, call
+import time
+import numpy as np
+from database import vectordb_client
+from common.exceptions import CollectionNotFoundError
+
+
+def test_maximal_marginal_relevance_skips_near_duplicates():
+    # setup static data
+    embeddings = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]], dtype=np.float32)
+    query_similarities = np.array([0.9, 0.89, 0.5], dtype=np.float32)
+    # act
+    selected = vectordb_client.maximal_marginal_relevance(query_similarities, embeddings, 2, 0.5)
+    # assert result
+    assert selected == [0, 2]
+
+
+def test_maximal_marginal_relevance_lambda_one_keeps_relevance_order():
+    # setup static data
+    embeddings = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]], dtype=np.float32)
+    query_similarities = np.array([0.5, 0.9, 0.7], dtype=np.float32)
+    # act
+    selected = vectordb_client.maximal_marginal_relevance(query_similarities, embeddings, 3, 1.0)
+    # assert result
+    assert selected == [1, 2, 0]
+
+
+def test_maximal_marginal_relevance_k_larger_than_candidates():
+    # setup static data
+    embeddings = np.array([[1.0, 0.0]], dtype=np.float32)
+    query_similarities = np.array([0.5], dtype=np.float32)
+    # act
+    selected = vectordb_client.maximal_marginal_relevance(query_similarities, embeddings, 10, 0.5)
+    # assert result
+    assert selected == [0]
+
+
+def test_rerank_with_mmr_keeps_query_result_shape():
+    # setup static data
+    query_result = {
+        "ids": [["a", "b", "c"]],
+        "documents": [["doc a", "doc a copy", "doc c"]],
+        "metadatas": [[{"file_name": "a"}, {"file_name": "b"}, {"file_name": "c"}]],
+        "distances": [[0.1, 0.12, 0.6]],
+        "embeddings": [np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]])],
+    }
+    # act
+    reranked = vectordb_client.rerank_with_mmr(query_result, 2, 0.5, "l2")
+    # assert result
+    assert reranked["ids"] == [["a", "c"]]
+    assert reranked["documents"] == [["doc a", "doc c"]]
+    assert reranked["metadatas"] == [[{"file_name": "a"}, {"file_name": "c"}]]
+
+
+@patch("database.vectordb_client.chroma_client")
+def test_find_related_documents_to_query_with_mmr_over_fetches(mock_chroma_client):
+    # setup mocks
+    mock_collection = MagicMock()
+    mock_chroma_client.get_collection_by_name.return_value = mock_collection
+    mock_chroma_client.get_distance_space.return_value = "cosine"
+    mock_chroma_client.find_k_nearest_neighbour.return_value = {
+        "ids": [["a", "b"]],
+        "documents": [["doc a", "doc b"]],
+        "metadatas": [[{"file_name": "a"}, {"file_name": "b"}]],
+        "distances": [[0.1, 0.2]],
+        "embeddings": [np.array([[1.0, 0.0], [0.0, 1.0]])],
+    }
+    # act
+    result = vectordb_client.find_related_documents_to_query("query", "10.0", "skye", use_mmr=True)
+    # assert result
+    assert [pair["document"] for pair in result["documents"]] == ["doc a", "doc b"]
+    expected_fetch_k = vectordb_client.constants.VECTOR_NUMBER_OF_RESULTS * (
+        vectordb_client.constants.VECTOR_MMR_FETCH_K_MULTIPLIER
+    )
+    mock_chroma_client.find_k_nearest_neighbour.assert_called_once_with(
+        mock_collection, "query", expected_fetch_k, include_embeddings=True
+    )
+
+
+@patch("database.vectordb_client.chroma_client")
+def test_find_related_documents_to_query_without_mmr(mock_chroma_client):
+    # setup mocks
+    mock_collection = MagicMock()
+    mock_chroma_client.get_collection_by_name.return_value = mock_collection
+    mock_chroma_client.find_k_nearest_neighbour.return_value = {
+        "documents": [["doc a"]],
+        "metadatas": [[{"file_name": "a"}]],
+    }
+    # act
+    result = vectordb_client.find_related_documents_to_query("query", "10.0", "skye", use_mmr=False)
+    # assert result
+    assert result == {"documents": [{"document": "doc a", "metadata": {"file_name": "a"}}]}
+    mock_chroma_client.find_k_nearest_neighbour.assert_called_once_with(
+        mock_collection, "query", vectordb_client.constants.VECTOR_NUMBER_OF_RESULTS
+    )
+
+
+@patch("database.vectordb_client.chroma_client")
+def test_resolve_collection_names_defaults_to_latest_version_and_both_sources(mock_chroma_client):
+    # setup mocks
+    mock_chroma_client.list_collection_names.return_value = ["SkyeDoc-9.16", "SkyeDoc-10.0", "InnoveoPartnerHub"]
+    # act
+    collection_names = vectordb_client.resolve_collection_names()
+    # assert result
+    assert collection_names == ["SkyeDoc-10.0", "InnoveoPartnerHub"]
+
+
+def test_resolve_collection_names_scoped_to_source_and_version():
+    # act
+    skye_collection_names = vectordb_client.resolve_collection_names("9.16", "skye")
+    iph_collection_names = vectordb_client.resolve_collection_names("9.16", "iph")
+    # assert result
+    assert skye_collection_names == ["SkyeDoc-9.16"]
+    assert iph_collection_names == ["InnoveoPartnerHub"]
+
+
+@patch("database.vectordb_client.chroma_client")
+def test_find_related_documents_to_query_merges_collections_by_similarity(mock_chroma_client):
+    # setup mocks
+    mock_chroma_client.get_distance_space.return_value = "cosine"
+    mock_chroma_client.find_k_nearest_neighbour.side_effect = [
+        {"documents": [["skye doc"]], "metadatas": [[{"source": "skye"}]], "distances": [[0.4]]},
+        {"documents": [["iph doc"]], "metadatas": [[{"source": "iph"}]], "distances": [[0.1]]},
+    ]
+    # act
+    result = vectordb_client.find_related_documents_to_query("query", "10.0", use_mmr=False)
+    # assert result
+    assert [pair["document"] for pair in result["documents"]] == ["iph doc", "skye doc"]
+    mock_chroma_client.get_collection_by_name.assert_has_calls([call("SkyeDoc-10.0"), call("InnoveoPartnerHub")])
+
+
+@patch("database.vectordb_client.chroma_client")
+def test_find_related_documents_in_collections_queries_concurrently(mock_chroma_client):
+    # setup static data
+    collection_names = ["SkyeDoc-10.0", "SkyeDoc-9.16", "InnoveoPartnerHub"]
+    query_delay_seconds = 0.2
+
+    # setup mocks
+    def slow_query(collection, query, k, include_embeddings=False):
+        time.sleep(query_delay_seconds)
+        return {"documents": [[collection]], "metadatas": [[{}]], "distances": [[0.1]]}
+
+    mock_chroma_client.get_collection_by_name.side_effect = lambda name: name
+    mock_chroma_client.get_distance_space.return_value = "cosine"
+    mock_chroma_client.find_k_nearest_neighbour.side_effect = slow_query
+
+    # act
+    start_time = time.perf_counter()
+    result = vectordb_client.find_related_documents_in_collections(
+        "query", collection_names, k_per_collection=3, use_mmr=False
+    )
+    elapsed_seconds = time.perf_counter() - start_time
+
+    # assert result
+    assert sorted(pair["document"] for pair in result["documents"]) == sorted(collection_names)
+    assert elapsed_seconds < query_delay_seconds * len(collection_names)
+    for call_args in mock_chroma_client.find_k_nearest_neighbour.call_args_list:
+        assert call_args.args[2] == 3
+
+
+@patch("database.vectordb_client.chroma_client")
+def test_find_related_documents_in_collections_skips_missing_collection(mock_chroma_client):
+    # setup mocks
+    def get_collection(name):
+        if name == "missing":
+            raise CollectionNotFoundError()
+        return name
+
+    mock_chroma_client.get_collection_by_name.side_effect = get_collection
+    mock_chroma_client.get_distance_space.return_value = "l2"
+    mock_chroma_client.find_k_nearest_neighbour.return_value = {
+        "documents": [["doc"]],
+        "metadatas": [[{}]],
+        "distances": [[0.2]],
+    }
+
+    # act
+    result = vectordb_client.find_related_documents_in_collections("query", ["missing", "present"], use_mmr=False)
+
+    # assert result
+    assert result == {"documents": [{"document": "doc", "metadata": {}}]}
+
+
+@patch("database.vectordb_client.chroma_client")
+def test_find_related_documents_collapses_children_to_unique_parents(mock_chroma_client):
+    # setup mocks
+    mock_collection = MagicMock()
+    mock_collection.name = "SkyeDoc-10.0"
+    mock_parent_collection = MagicMock()
+    mock_chroma_client.get_collection_by_name.side_effect = [mock_collection, mock_parent_collection]
+    mock_chroma_client.get_distance_space.return_value = "cosine"
+    mock_chroma_client.find_k_nearest_neighbour.return_value = {
+        "documents": [["child 1 of b", "child 1 of a", "child 2 of b"]],
+        "metadatas": [[{"parent_id": "b"}, {"parent_id": "a"}, {"parent_id": "b"}]],
+        "distances": [[0.1, 0.2, 0.3]],
+    }
+    mock_chroma_client.get_by_ids.return_value = {
+        "ids": ["a", "b"],
+        "documents": ["# Section a", "# Section b"],
+        "metadatas": [{"file_name": "a"}, {"file_name": "b"}],
+    }
+
+    # act
+    result = vectordb_client.find_related_documents_to_query("query", "10.0", "skye", use_mmr=False)
+
+    # assert result
+    assert [pair["document"] for pair in result["documents"]] == ["# Section b", "# Section a"]
+    mock_chroma_client.get_collection_by_name.assert_called_with("SkyeDoc-10.0-parents")
+    mock_chroma_client.get_by_ids.assert_called_once_with(mock_parent_collection, ["b", "a"])
@@ -44,7 +44,7 @@ async def test_agent_response_streaming_service_stream_agent_response_happy_path
 
     # assert agent_service calls
     mock_agent_service_class.assert_called_once_with(mock_store_manager, ANY)
-    mock_agent_service_instance.stream_agent_response.assert_called_once_with(user_question, test_conversation_id)
+    mock_agent_service_instance.stream_agent_response.assert_called_once_with(user_question, test_conversation_id, None)
     assert mock_format_str_to_sse.called
 
     # assert dynamic loading text calls
@@ -81,7 +81,7 @@ async def test_aggregated_agent_response_with_context_happy_path(mock_agent_serv
 
     # assert calls
     mock_agent_service_class.assert_called_once_with(mock_store_manager, ANY)
-    agent_service_instance.stream_agent_response.assert_called_once_with(user_question, test_conversation_id)
+    agent_service_instance.stream_agent_response.assert_called_once_with(user_question, test_conversation_id, None)
     mock_store_manager.get_conversation_context.assert_called_once_with(test_conversation_id)
 
 
@@ -1,7 +1,7 @@
 from unittest.mock import patch
 from services.setup_services import IngestionService, DatabaseService
 import pytest
-from common import constants
+from common import constants, utils
 from common.exceptions import VectorDBError, CollectionNotFoundError
 
 
@@ -95,7 +95,12 @@ async def test_ingestion_service_import_skyedoc_happy_path(mock_scan_and_import,
 
     mock_generate_path.assert_called_once_with(test_skye_version)
     mock_scan_and_import.assert_called_once_with(
-        constants.SKYE_DOC_COLLECTION_NAME, expected_folder_path, test_markdown_headers
+        utils.generate_skye_doc_collection_name(test_skye_version),
+        expected_folder_path,
+        test_markdown_headers,
+        {"skye_version": test_skye_version},
+        parent_document_retrieval=False,
+        index_configuration=None,
     )
 
 
@@ -118,7 +123,12 @@ async def test_ingestion_service_import_skyedoc_generic_error(mock_scan_and_impo
     assert error_message in str(exc_info.value)
     mock_generate_path.assert_called_once_with(test_skye_version)
     mock_scan_and_import.assert_called_once_with(
-        constants.SKYE_DOC_COLLECTION_NAME, expected_folder_path, test_markdown_headers
+        utils.generate_skye_doc_collection_name(test_skye_version),
+        expected_folder_path,
+        test_markdown_headers,
+        {"skye_version": test_skye_version},
+        parent_document_retrieval=False,
+        index_configuration=None,
     )
 
 
@@ -131,7 +141,11 @@ async def test_ingestion_service_import_iph_happy_path(mock_scan_and_import):
     service.import_iph(test_markdown_headers)
 
     mock_scan_and_import.assert_called_once_with(
-        constants.IPH_DOC_COLLECTION_NAME, constants.IPH_LOCAL_FOLDER_LOCATION, test_markdown_headers
+        constants.IPH_DOC_COLLECTION_NAME,
+        constants.IPH_LOCAL_FOLDER_LOCATION,
+        test_markdown_headers,
+        parent_document_retrieval=False,
+        index_configuration=None,
     )
 
 
@@ -149,7 +163,11 @@ async def test_ingestion_service_import_iph_generic_error(mock_scan_and_import):
 
     assert error_message in str(exc_info.value)
     mock_scan_and_import.assert_called_once_with(
-        constants.IPH_DOC_COLLECTION_NAME, constants.IPH_LOCAL_FOLDER_LOCATION, test_markdown_headers
+        constants.IPH_DOC_COLLECTION_NAME,
+        constants.IPH_LOCAL_FOLDER_LOCATION,
+        test_markdown_headers,
+        parent_document_retrieval=False,
+        index_configuration=None,
     )
 
 